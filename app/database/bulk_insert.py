@@ -0,0 +1,196 @@
+import os
+import time
+import shutil
+import uuid
+import numpy as np
+from pymilvus import utility, BulkInsertState
+from .milvus_connection import is_milvus_lite
+
+# 로컬에 columnar 파일을 쓰고 MinIO에 업로드한 뒤 utility.do_bulk_insert로 가져오는 설정
+# (db/milvus_db/docker-compose.yml의 MinIO 기본값, Milvus 기본 버킷은 a-bucket)
+BULK_INSERT_DIR = os.path.join("db", "bulk_insert")
+MINIO_ADDRESS = os.environ.get("MILVUS_MINIO_ADDRESS", "localhost:9000")
+MINIO_ACCESS_KEY = os.environ.get("MILVUS_MINIO_ACCESS_KEY", "minioadmin")
+MINIO_SECRET_KEY = os.environ.get("MILVUS_MINIO_SECRET_KEY", "minioadmin")
+MINIO_BUCKET = os.environ.get("MILVUS_MINIO_BUCKET", "a-bucket")
+
+# 이보다 작은 split은 기존 insert 경로 사용 (파일 작성/업로드/import task 오버헤드가 더 큼)
+BULK_INSERT_MIN_ROWS = 100_000
+# numpy: Milvus 2.3.x부터 지원 / parquet: Milvus 2.3.4 이상 필요
+BULK_FILE_FORMATS = ["numpy", "parquet"]
+
+def use_bulk_insert(num_rows, ingest_mode="auto"):
+    """ingest_mode(auto / insert / bulk_insert)와 split 크기로 bulk insert 사용 여부 결정"""
+    # Milvus Lite는 MinIO/import task가 없으므로 항상 insert 경로 사용
+    if is_milvus_lite():
+        return False
+    if ingest_mode == "auto":
+        return num_rows >= BULK_INSERT_MIN_ROWS
+    return ingest_mode == "bulk_insert"
+
+## --------------- Columnar File Writer --------------- ##
+class BulkFileWriter:
+    """chunk 단위 임베딩을 import용 columnar 파일로 기록
+
+    numpy: 필드별 .npy 파일 (vector는 전체 행 수로 미리 할당한 memmap에 기록)
+    parquet: chunk마다 row group을 추가하는 단일 .parquet 파일
+    with_ids=True이면 결정적 row key(id) 컬럼도 함께 기록 (auto_id=False 컬렉션)
+    """
+    def __init__(self, collection_name, set_type, dim, total_rows, file_format="numpy", with_ids=False,
+                 base_dir=BULK_INSERT_DIR):
+        if file_format not in BULK_FILE_FORMATS:
+            raise ValueError(f"Unknown bulk file format: {file_format} (expected one of {BULK_FILE_FORMATS})")
+        self.set_type = set_type
+        self.dim = dim
+        self.file_format = file_format
+        self.remote_dir = f"bulk_insert/{collection_name}/{set_type}/{uuid.uuid4().hex}"
+        self.local_dir = os.path.join(base_dir, collection_name, set_type, os.path.basename(self.remote_dir))
+        os.makedirs(self.local_dir, exist_ok=True)
+        self.with_ids = with_ids
+        self.rows = 0
+        self.labels = []
+        self.ids = []
+        self._paths = None
+
+        if file_format == "numpy":
+            self._vectors = np.lib.format.open_memmap(
+                os.path.join(self.local_dir, "vector.npy"), mode="w+", dtype=np.float32, shape=(total_rows, dim)
+            )
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            self._schema = pa.schema(([("id", pa.int64())] if with_ids else []) + [
+                ("set_type", pa.string()),
+                ("class", pa.string()),
+                ("vector", pa.list_(pa.float32())),
+            ])
+            self._parquet = pq.ParquetWriter(os.path.join(self.local_dir, "data.parquet"), self._schema)
+
+    def append(self, vectors, labels, ids=None):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        labels = [str(label) for label in labels]
+        if self.with_ids and ids is None:
+            raise ValueError("ids are required for a collection with deterministic row keys")
+
+        if self.file_format == "numpy":
+            self._vectors[self.rows:self.rows + len(vectors)] = vectors
+            self.labels.extend(labels)
+            if self.with_ids:
+                self.ids.extend(int(key) for key in ids)
+        else:
+            import pyarrow as pa
+            id_columns = [pa.array(np.asarray(ids, dtype=np.int64), pa.int64())] if self.with_ids else []
+            table = pa.Table.from_arrays(id_columns + [
+                pa.array([self.set_type] * len(vectors), pa.string()),
+                pa.array(labels, pa.string()),
+                pa.array(list(vectors), pa.list_(pa.float32())),
+            ], schema=self._schema)
+            self._parquet.write_table(table)
+        self.rows += len(vectors)
+
+    def close(self):
+        """파일을 마무리하고 로컬 파일 경로 목록 반환 (여러 번 호출해도 한 번만 기록)"""
+        if self._paths is not None:
+            return self._paths
+        if self.file_format == "parquet":
+            self._parquet.close()
+            self._paths = [os.path.join(self.local_dir, "data.parquet")]
+            return self._paths
+
+        vector_path = os.path.join(self.local_dir, "vector.npy")
+        if self.rows < len(self._vectors):
+            # 실패한 chunk가 있으면 실제 기록된 행까지만 다시 저장
+            vectors = np.array(self._vectors[:self.rows])
+            self._vectors = None
+            np.save(vector_path, vectors)
+        else:
+            self._vectors.flush()
+            self._vectors = None
+
+        paths = [vector_path]
+        for field, values in (("set_type", [self.set_type] * self.rows), ("class", self.labels)):
+            path = os.path.join(self.local_dir, f"{field}.npy")
+            np.save(path, np.array(values, dtype=str))
+            paths.append(path)
+        if self.with_ids:
+            path = os.path.join(self.local_dir, "id.npy")
+            np.save(path, np.array(self.ids, dtype=np.int64))
+            paths.append(path)
+        self._paths = paths
+        return paths
+
+    def cleanup(self):
+        shutil.rmtree(self.local_dir, ignore_errors=True)
+
+## --------------- Upload & Import --------------- ##
+def get_minio_client():
+    from minio import Minio
+    return Minio(MINIO_ADDRESS, access_key=MINIO_ACCESS_KEY, secret_key=MINIO_SECRET_KEY, secure=False)
+
+def upload_files(local_paths, remote_dir, bucket=MINIO_BUCKET):
+    """Milvus가 사용하는 MinIO 버킷에 업로드 후 object 경로 목록 반환"""
+    client = get_minio_client()
+    if not client.bucket_exists(bucket):
+        raise RuntimeError(f"MinIO bucket '{bucket}' not found at {MINIO_ADDRESS}. Check MILVUS_MINIO_BUCKET.")
+    remote_paths = []
+    for path in local_paths:
+        remote_path = f"{remote_dir}/{os.path.basename(path)}"
+        client.fput_object(bucket, remote_path, path)
+        remote_paths.append(remote_path)
+    return remote_paths
+
+def remove_remote_files(remote_paths, bucket=MINIO_BUCKET):
+    client = get_minio_client()
+    for remote_path in remote_paths:
+        try:
+            client.remove_object(bucket, remote_path)
+        except Exception:
+            pass
+
+def wait_for_bulk_insert(task_id, poll_interval=2.0, timeout=3600, on_progress=None):
+    """import task가 완료(ImportCompleted)될 때까지 상태를 polling, 실패 시 RuntimeError"""
+    deadline = time.monotonic() + timeout
+    while True:
+        state = utility.get_bulk_insert_state(task_id=task_id)
+        if on_progress is not None:
+            on_progress(state)
+        if state.state == BulkInsertState.ImportCompleted:
+            return state
+        if state.state in (BulkInsertState.ImportFailed, BulkInsertState.ImportFailedAndCleaned):
+            raise RuntimeError(f"Bulk insert task {task_id} failed: {state.failed_reason}")
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Bulk insert task {task_id} did not finish within {timeout}s "
+                               f"(state: {state.state_name}, progress: {state.progress}%)")
+        time.sleep(poll_interval)
+
+def start_bulk_insert(collection_name, partition_name, writer):
+    """columnar 파일을 업로드하고 import task를 등록 (완료는 기다리지 않음)"""
+    task = {"writer": writer, "remote_paths": [], "task_id": None}
+    local_paths = writer.close()
+    if writer.rows == 0:
+        return task
+    try:
+        task["remote_paths"] = upload_files(local_paths, writer.remote_dir)
+        task["task_id"] = utility.do_bulk_insert(collection_name=collection_name, partition_name=partition_name,
+                                                 files=task["remote_paths"])
+    except Exception:
+        cleanup_bulk_insert(task)
+        raise
+    return task
+
+def finish_bulk_insert(task, on_progress=None):
+    """import task 완료까지 polling 후 가져온 행 수 반환"""
+    try:
+        if task["task_id"] is None:
+            return 0
+        return wait_for_bulk_insert(task["task_id"], on_progress=on_progress).row_count
+    finally:
+        cleanup_bulk_insert(task)
+
+def cleanup_bulk_insert(task):
+    task["writer"].cleanup()
+    remove_remote_files(task["remote_paths"])
+
+def bulk_insert_files(collection_name, partition_name, writer, on_progress=None):
+    """columnar 파일을 업로드하고 import task를 실행한 뒤 가져온 행 수 반환"""
+    return finish_bulk_insert(start_bulk_insert(collection_name, partition_name, writer), on_progress=on_progress)
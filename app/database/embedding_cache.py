@@ -0,0 +1,165 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+
+# 캐시 저장 위치 및 최대 크기
+EMBEDDING_CACHE_DIR = os.path.join("db", "embedding_cache")
+EMBEDDING_CACHE_MAX_BYTES = 2 * 1024 ** 3  # 2GB
+
+## --------------- Embedding Cache --------------- ##
+class EmbeddingCache:
+    """(텍스트 해시, 모델, max_len, pooling) 기준으로 임베딩을 디스크에 저장하는 캐시
+
+    벡터는 memory-mapped float32 파일의 slot에, 키 -> slot 매핑은 sqlite 인덱스에 저장
+    용량 초과 시 가장 오래 사용되지 않은(LRU) 항목부터 slot을 재사용
+    """
+    def __init__(self, cache_dir=EMBEDDING_CACHE_DIR, dim=768, max_bytes=EMBEDDING_CACHE_MAX_BYTES):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.dim = dim
+        self.row_bytes = dim * np.dtype(np.float32).itemsize
+        self.capacity = max(1, int(max_bytes // self.row_bytes))
+        self.vector_path = os.path.join(cache_dir, f"vectors_{dim}.f32")
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.conn = sqlite3.connect(os.path.join(cache_dir, f"index_{dim}.sqlite"), check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, slot INTEGER UNIQUE, last_used REAL)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        # 용량이 줄어든 경우 범위 밖 slot 제거
+        self.conn.execute("DELETE FROM entries WHERE slot >= ?", (self.capacity,))
+        self.conn.commit()
+
+        file_rows = os.path.getsize(self.vector_path) // self.row_bytes if os.path.exists(self.vector_path) else 0
+        self._rows = min(file_rows, self.capacity)
+        self._vectors = None
+        self._open(max(self._rows, 1))
+
+        used = {slot for (slot,) in self.conn.execute("SELECT slot FROM entries")}
+        self._free = [slot for slot in range(self._rows) if slot not in used]
+        self._next_slot = self._rows
+
+    @staticmethod
+    def namespace(model_name, max_len, pooling="cls"):
+        return f"{model_name}|{max_len}|{pooling}"
+
+    @staticmethod
+    def make_keys(texts, namespace):
+        return [hashlib.sha256(f"{namespace}\x00{text}".encode("utf-8")).hexdigest() for text in texts]
+
+    def _open(self, rows):
+        """memmap 파일을 rows 크기 이상으로 확장하여 다시 연결"""
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        size = rows * self.row_bytes
+        mode = "r+b" if os.path.exists(self.vector_path) else "w+b"
+        with open(self.vector_path, mode) as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() < size:
+                f.truncate(size)
+        self._vectors = np.memmap(self.vector_path, dtype=np.float32, mode="r+", shape=(rows, self.dim))
+        self._rows = rows
+
+    def _allocate(self, n):
+        slots = []
+        while self._free and len(slots) < n:
+            slots.append(self._free.pop())
+        while len(slots) < n and self._next_slot < self.capacity:
+            slots.append(self._next_slot)
+            self._next_slot += 1
+
+        # 남은 slot은 LRU 항목을 제거하여 확보
+        if len(slots) < n:
+            victims = self.conn.execute(
+                "SELECT key, slot FROM entries ORDER BY last_used ASC LIMIT ?", (n - len(slots),)
+            ).fetchall()
+            self.conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key, _ in victims])
+            slots.extend(slot for _, slot in victims)
+            self.evictions += len(victims)
+
+        needed = max(slots) + 1 if slots else 0
+        if needed > self._rows:
+            self._open(min(self.capacity, max(needed, self._rows * 2)))
+        return slots
+
+    def lookup(self, texts, namespace):
+        """캐시된 벡터와 hit 여부 마스크 반환 (miss 행은 0으로 채워짐)"""
+        keys = self.make_keys(texts, namespace)
+        vectors = np.zeros((len(keys), self.dim), dtype=np.float32)
+        hit_mask = np.zeros(len(keys), dtype=bool)
+
+        with self.lock:
+            key_slots = {}
+            # sqlite 변수 개수 제한을 고려하여 나누어 조회
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = self.conn.execute(
+                    f"SELECT key, slot FROM entries WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                key_slots.update(rows)
+
+            for i, key in enumerate(keys):
+                slot = key_slots.get(key)
+                if slot is not None:
+                    vectors[i] = self._vectors[slot]
+                    hit_mask[i] = True
+
+            now = time.time()
+            self.conn.executemany("UPDATE entries SET last_used = ? WHERE key = ?", [(now, key) for key in key_slots])
+            self.conn.commit()
+            self.hits += int(hit_mask.sum())
+            self.misses += int(len(keys) - hit_mask.sum())
+
+        return vectors, hit_mask
+
+    def store(self, texts, namespace, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[1] != self.dim:
+            raise ValueError(f"Embedding dimension {vectors.shape[-1]} does not match cache dimension {self.dim}")
+
+        # 중복 키 제거 후 용량 내에서만 저장
+        unique = {}
+        for key, vector in zip(self.make_keys(texts, namespace), vectors):
+            unique[key] = vector
+        items = list(unique.items())[-self.capacity:]
+
+        with self.lock:
+            existing = set()
+            for i in range(0, len(items), 500):
+                chunk = [key for key, _ in items[i:i + 500]]
+                existing.update(key for (key,) in self.conn.execute(
+                    f"SELECT key FROM entries WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ))
+            items = [(key, vector) for key, vector in items if key not in existing]
+            if not items:
+                return 0
+
+            slots = self._allocate(len(items))
+            for slot, (_, vector) in zip(slots, items):
+                self._vectors[slot] = vector
+            self._vectors.flush()
+
+            now = time.time()
+            self.conn.executemany(
+                "INSERT INTO entries (key, slot, last_used) VALUES (?, ?, ?)",
+                [(key, slot, now) for slot, (key, _) in zip(slots, items)]
+            )
+            self.conn.commit()
+        return len(items)
+
+    def stats(self):
+        with self.lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "size_mb": entries * self.row_bytes / 1024 ** 2,
+            "capacity_mb": self.capacity * self.row_bytes / 1024 ** 2,
+        }
@@ -0,0 +1,173 @@
+import sys
+import json
+import time
+import queue
+import base64
+import argparse
+import threading
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+
+# 기본 서버 주소 및 dynamic batching 설정
+EMBEDDING_SERVER_HOST = "127.0.0.1"
+EMBEDDING_SERVER_PORT = 8765
+MAX_BATCH_ROWS = 256
+MAX_WAIT_MS = 10
+
+## --------------- 직렬화 --------------- ##
+def encode_array(array):
+    array = np.ascontiguousarray(array, dtype=np.float32)
+    return {"shape": list(array.shape), "embeddings": base64.b64encode(array.tobytes()).decode("ascii")}
+
+def decode_array(payload):
+    return np.frombuffer(base64.b64decode(payload["embeddings"]), dtype=np.float32).reshape(payload["shape"])
+
+## --------------- Dynamic Batching --------------- ##
+class DynamicBatcher:
+    """여러 세션/CLI 요청을 모아 하나의 배치로 추론
+
+    첫 요청 도착 후 max_wait_ms 동안 또는 max_batch_rows가 찰 때까지 요청을 모으고,
+    같은 max_len끼리 묶어 token budget 배치로 한 번에 임베딩
+    """
+    def __init__(self, pipeline, max_batch_rows=MAX_BATCH_ROWS, max_wait_ms=MAX_WAIT_MS):
+        self.pipeline = pipeline
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000
+        self.requests = queue.Queue()
+        self.stats = {"requests": 0, "rows": 0, "batches": 0}
+        self.stats_lock = threading.Lock()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, texts, max_len):
+        future = Future()
+        self.requests.put((texts, max_len, future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self.requests.get()]
+            rows = len(batch[0][0])
+            deadline = time.monotonic() + self.max_wait
+            while rows < self.max_batch_rows:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self.requests.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                rows += len(item[0])
+            self._process(batch)
+
+    def _process(self, batch):
+        groups = {}
+        for item in batch:
+            groups.setdefault(item[1], []).append(item)
+
+        for max_len, items in groups.items():
+            texts = [text for item in items for text in item[0]]
+            try:
+                embeddings = self.pipeline.generate_embeddings(
+                    pd.DataFrame({"text": texts}), "text", max_len=max_len, batching="token_budget", num_workers=0
+                )
+                if embeddings is None:
+                    raise RuntimeError("embedding failed for every batch")
+            except Exception as e:
+                for _, _, future in items:
+                    future.set_exception(e)
+                continue
+
+            offset = 0
+            for item_texts, _, future in items:
+                future.set_result(embeddings[offset:offset + len(item_texts)])
+                offset += len(item_texts)
+
+        with self.stats_lock:
+            self.stats["requests"] += len(batch)
+            self.stats["rows"] += sum(len(item[0]) for item in batch)
+            self.stats["batches"] += 1
+
+## --------------- HTTP Server --------------- ##
+class EmbeddingRequestHandler(BaseHTTPRequestHandler):
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _model_info(self):
+        pipeline = self.server.batcher.pipeline
+        return {"model_name": pipeline.model_name, "backend": pipeline.backend,
+                "pooling": pipeline.pooling, "device": pipeline.device}
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send_json(404, {"error": f"unknown path: {self.path}"})
+            return
+        with self.server.batcher.stats_lock:
+            stats = dict(self.server.batcher.stats)
+        self._send_json(200, {**self._model_info(), "stats": stats})
+
+    def do_POST(self):
+        if self.path != "/embed":
+            self._send_json(404, {"error": f"unknown path: {self.path}"})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            texts = [str(text) for text in request["texts"]]
+            max_len = int(request.get("max_len", 128))
+        except Exception as e:
+            self._send_json(400, {"error": f"invalid request: {e}"})
+            return
+
+        info = self._model_info()
+        if request.get("model_name", info["model_name"]) != info["model_name"]:
+            self._send_json(400, {"error": f"server holds {info['model_name']}, not {request['model_name']}"})
+            return
+
+        try:
+            embeddings = self.server.batcher.submit(texts, max_len).result() if texts else np.zeros((0, 0))
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+            return
+        self._send_json(200, {**info, **encode_array(embeddings)})
+
+    def log_message(self, format, *args):
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 임베딩 서버 (dynamic batching)")
+    parser.add_argument("--host", default=EMBEDDING_SERVER_HOST)
+    parser.add_argument("--port", type=int, default=EMBEDDING_SERVER_PORT)
+    parser.add_argument("--model", default="klue/roberta-base")
+    parser.add_argument("--device", default=None)
+    parser.add_argument("--backend", default="torch")
+    parser.add_argument("--pooling", default="cls")
+    parser.add_argument("--max-batch-rows", type=int, default=MAX_BATCH_ROWS)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    from transformers import AutoTokenizer
+    from app.database.utils import EmbeddingPipeline, load_encoder
+
+    # streamlit 세션 없이 실행하므로 모델을 직접 로드
+    pipeline = EmbeddingPipeline(model_name=args.model, device=args.device, backend=args.backend, pooling=args.pooling)
+    pipeline.tokenizer = AutoTokenizer.from_pretrained(args.model, use_fast=pipeline.use_fast)
+    pipeline.model = load_encoder(args.model, pipeline.device, args.backend)
+
+    server = ThreadingHTTPServer((args.host, args.port), EmbeddingRequestHandler)
+    server.batcher = DynamicBatcher(pipeline, max_batch_rows=args.max_batch_rows, max_wait_ms=args.max_wait_ms)
+    print(f"🚀 Embedding server ({args.model}, {pipeline.device}, {args.backend}) on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+        sys.exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import os
+import json
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+
+# 컬렉션별 split 삽입 진행 상황 저장 위치
+INGEST_CHECKPOINT_DIR = os.path.join("db", "ingest_checkpoints")
+
+## --------------- Row Keys --------------- ##
+def make_row_keys(texts, set_type):
+    """(set_type, 텍스트, 같은 텍스트의 등장 순번) 해시로 만든 결정적 INT64 primary key
+
+    같은 데이터를 다시 삽입하면 같은 key가 나오므로 upsert로 중복 행 없이 덮어쓸 수 있음
+    """
+    texts = pd.Series(texts).astype(str).reset_index(drop=True)
+    occurrences = texts.groupby(texts).cumcount()
+    keys = np.empty(len(texts), dtype=np.int64)
+    for i, (text, occurrence) in enumerate(zip(texts, occurrences)):
+        digest = hashlib.sha256(f"{set_type}\x00{occurrence}\x00{text}".encode("utf-8")).digest()
+        keys[i] = int.from_bytes(digest[:8], "big") & 0x7FFF_FFFF_FFFF_FFFF
+    return keys
+
+def content_digest(texts, labels=None):
+    """split 텍스트(와 라벨) 전체의 sha256 (같은 행 수라도 내용이 바뀌면 checkpoint fingerprint가 달라짐)"""
+    digest = hashlib.sha256()
+    for text in pd.Series(texts).astype(str):
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\x00")
+    if labels is not None:
+        digest.update(b"\x01")
+        for label in labels:
+            digest.update(str(label).encode("utf-8"))
+            digest.update(b"\x00")
+    return digest.hexdigest()[:16]
+
+## --------------- Checkpoint --------------- ##
+class IngestCheckpoint:
+    """split별로 Milvus에 반영된 마지막 행 offset을 JSON 파일에 기록
+
+    fingerprint(모델, max_len, projection, 행 수 등)가 다르면 이전 진행 상황을 무시하고 처음부터 삽입
+    """
+    def __init__(self, collection_name, base_dir=INGEST_CHECKPOINT_DIR):
+        os.makedirs(base_dir, exist_ok=True)
+        self.path = os.path.join(base_dir, f"{collection_name}.json")
+        self.lock = threading.Lock()
+        self.state = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.state = json.load(f)
+            except (OSError, ValueError):
+                self.state = {}
+
+    @staticmethod
+    def fingerprint(**config):
+        return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+    def get_offset(self, split, fingerprint):
+        entry = self.state.get(split)
+        if entry is None or entry.get("fingerprint") != fingerprint:
+            return 0
+        return entry["offset"]
+
+    def is_complete(self, split, fingerprint):
+        entry = self.state.get(split)
+        return entry is not None and entry.get("fingerprint") == fingerprint and entry["offset"] >= entry["total"]
+
+    def has_entry(self, split):
+        return split in self.state
+
+    def is_stale(self, split, fingerprint):
+        """다른 fingerprint(설정/데이터)로 기록된 진행 상황이 있는지"""
+        entry = self.state.get(split)
+        return entry is not None and entry.get("fingerprint") != fingerprint
+
+    def has_progress(self, split):
+        return self.state.get(split, {}).get("offset", 0) > 0
+
+    def commit(self, split, fingerprint, offset, total):
+        with self.lock:
+            self.state[split] = {"fingerprint": fingerprint, "offset": int(offset), "total": int(total)}
+            self._save()
+
+    def reset(self, split=None):
+        with self.lock:
+            if split is None:
+                self.state = {}
+            else:
+                self.state.pop(split, None)
+            self._save()
+
+    def _save(self):
+        # 중간에 중단되어도 파일이 깨지지 않도록 임시 파일에 쓴 뒤 교체
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,247 @@
+from pymilvus import utility, Collection, CollectionSchema, FieldSchema, DataType
+from pymilvus.client.types import LoadState
+from .milvus_connection import is_milvus_lite
+
+# 데이터셋 메타데이터는 벡터 컬렉션과 분리된 작은 컬렉션({collection}__metadata)에 한 행으로 저장
+METADATA_SUFFIX = "__metadata"
+METADATA_KEY = "dataset"
+
+# (필드명, 타입, VARCHAR 최대 길이)
+METADATA_FIELDS = [
+    ("dataset_name", DataType.VARCHAR, 100),
+    ("summary_dict", DataType.VARCHAR, 20000),
+    ("data_previews", DataType.VARCHAR, 20000),
+    ("class_dist_path", DataType.VARCHAR, 500),
+    ("doc_len_path", DataType.VARCHAR, 500),
+    ("doc_len_table", DataType.VARCHAR, 10000),
+    ("wordcloud_path", DataType.VARCHAR, 500),
+    ("timestamp", DataType.INT64, None),
+    # 데이터 드리프트 필드
+    ("dimension", DataType.FLOAT, None),
+    ("embedding_size", DataType.VARCHAR, 5000),
+    ("original_distance_path", DataType.VARCHAR, 500),
+    ("PCA_distance_path", DataType.VARCHAR, 500),
+    ("PCA_visualization_path", DataType.VARCHAR, 500),
+    ("drift_score_summary", DataType.VARCHAR, 10000),
+    # 삽입 시 기록하는 split manifest (JSON)
+    ("split_manifest", DataType.VARCHAR, 10000),
+]
+METADATA_FIELD_NAMES = [name for name, _, _ in METADATA_FIELDS]
+METADATA_DEFAULTS = {name: (0 if dtype == DataType.INT64 else 0.0 if dtype == DataType.FLOAT else "")
+                     for name, dtype, _ in METADATA_FIELDS}
+
+# 스키마 업그레이드 중 새 스키마로 옮긴 행을 보관하는 임시 컬렉션 (중단 시 다음 호출에서 복구)
+UPGRADE_SUFFIX = "_upgrading"
+
+# Milvus 컬렉션은 벡터 필드가 필수이므로 최소 크기의 placeholder 벡터 사용
+PLACEHOLDER_DIM = 2
+
+def metadata_collection_name(collection_name):
+    return f"{collection_name}{METADATA_SUFFIX}"
+
+def is_metadata_collection(collection_name):
+    return collection_name.endswith(METADATA_SUFFIX) or collection_name.endswith(METADATA_SUFFIX + UPGRADE_SUFFIX)
+
+def list_data_collections():
+    """메타데이터 컬렉션을 제외한 벡터 컬렉션 목록"""
+    return [name for name in utility.list_collections() if not is_metadata_collection(name)]
+
+def is_legacy_collection(collection_name):
+    """메타데이터 필드를 벡터 행마다 가진 기존(17컬럼) 스키마인지 확인"""
+    if not utility.has_collection(collection_name):
+        return False
+    return any(field.name == "summary_dict" for field in Collection(name=collection_name).schema.fields)
+
+## --------------- Metadata Collection --------------- ##
+def _create_metadata_collection(name, collection_name):
+    fields = [FieldSchema(name="key", dtype=DataType.VARCHAR, max_length=100, is_primary=True, auto_id=False)]
+    for field_name, dtype, max_length in METADATA_FIELDS:
+        if dtype == DataType.VARCHAR:
+            fields.append(FieldSchema(name=field_name, dtype=dtype, max_length=max_length))
+        else:
+            fields.append(FieldSchema(name=field_name, dtype=dtype))
+    fields.append(FieldSchema(name="meta_vector", dtype=DataType.FLOAT_VECTOR, dim=PLACEHOLDER_DIM))
+
+    schema = CollectionSchema(fields=fields, description=f"Metadata of {collection_name}")
+    collection = Collection(name=name, schema=schema)
+    collection.create_index(field_name="meta_vector", index_params={"index_type": "FLAT", "metric_type": "L2"})
+    return collection
+
+def _upsert_metadata_row(collection, metadata):
+    row = {**METADATA_DEFAULTS, **{k: v for k, v in metadata.items() if k in METADATA_DEFAULTS}}
+    data = [[METADATA_KEY]] + [[row[name]] for name in METADATA_FIELD_NAMES] + [[[0.0] * PLACEHOLDER_DIM]]
+    return collection.upsert(data)
+
+def _query_metadata_row(collection):
+    existing_fields = {field.name for field in collection.schema.fields}
+    if utility.load_state(collection.name) != LoadState.Loaded:
+        collection.load()
+    # flush 없이 upsert한 직후에도 최신 행을 읽도록 Strong consistency로 조회
+    rows = collection.query(expr=f"key == '{METADATA_KEY}'", limit=1, consistency_level="Strong",
+                            output_fields=[name for name in METADATA_FIELD_NAMES if name in existing_fields])
+    # 이전 스키마 컬렉션에 없는 필드는 기본값으로 채움
+    return {**METADATA_DEFAULTS, **rows[0]} if rows else None
+
+def _write_verified_metadata(name, collection_name, row):
+    """새 스키마 컬렉션(name)을 만들어 행을 기록하고 다시 읽어 같은지 확인 (다르면 삭제 후 예외)"""
+    if utility.has_collection(name):
+        utility.drop_collection(name)
+    collection = _create_metadata_collection(name, collection_name)
+    _upsert_metadata_row(collection, row)
+    written = _query_metadata_row(collection)
+    # FLOAT 필드는 float32로 저장되므로 문자열/정수 필드만 비교
+    mismatched = [field_name for field_name, dtype, _ in METADATA_FIELDS
+                  if dtype != DataType.FLOAT and (written or {}).get(field_name) != row.get(field_name)]
+    if written is None or mismatched:
+        utility.drop_collection(name)
+        raise RuntimeError(f"Metadata of '{collection_name}' could not be verified in '{name}' "
+                           f"(mismatched fields: {mismatched or 'row missing'}).")
+    return collection
+
+def get_metadata_collection(collection_name, load=True, upgrade=True):
+    name = metadata_collection_name(collection_name)
+    if upgrade:
+        _recover_metadata_collection(collection_name)
+    collection = Collection(name=name) if utility.has_collection(name) else None
+    if collection is not None and upgrade and _upgrade_metadata_collection(collection_name, collection):
+        collection = Collection(name=name)
+
+    if collection is None:
+        collection = _create_metadata_collection(name, collection_name)
+    # 조회할 때만 로드 (이미 로드된 경우 생략, 쓰기에는 로드가 필요 없음)
+    if load and utility.load_state(name) != LoadState.Loaded:
+        collection.load()
+    return collection
+
+def _recover_metadata_collection(collection_name):
+    """업그레이드가 기존 컬렉션 삭제 후 중단된 경우 임시 컬렉션의 행으로 복구"""
+    name = metadata_collection_name(collection_name)
+    tmp_name = f"{name}{UPGRADE_SUFFIX}"
+    if not utility.has_collection(tmp_name):
+        return
+    if not utility.has_collection(name):
+        row = _query_metadata_row(Collection(name=tmp_name))
+        if row is not None:
+            _write_verified_metadata(name, collection_name, row)
+    utility.drop_collection(tmp_name)
+
+def _upgrade_metadata_collection(collection_name, collection):
+    """필드가 추가되기 전에 만든 메타데이터 컬렉션을 새 스키마로 교체
+
+    새 스키마 임시 컬렉션에 행을 기록/확인한 뒤에만 기존 컬렉션을 삭제하고,
+    최종 컬렉션 기록이 확인되면 임시 컬렉션을 삭제 (어느 단계에서 실패해도 행이 한 곳에는 남음)
+    """
+    existing_fields = {field.name for field in collection.schema.fields}
+    if all(field_name in existing_fields for field_name in METADATA_FIELD_NAMES):
+        return False
+
+    row = _query_metadata_row(collection)
+    tmp_name = f"{collection.name}{UPGRADE_SUFFIX}"
+    if row is not None:
+        _write_verified_metadata(tmp_name, collection_name, row)
+    utility.drop_collection(collection.name)
+    if row is not None:
+        _write_verified_metadata(collection.name, collection_name, row)
+        utility.drop_collection(tmp_name)
+    return True
+
+def read_metadata(collection_name):
+    """메타데이터 한 행을 dict로 반환 (마이그레이션 전 컬렉션은 set_type == 'metadata' 행에서 조회)"""
+    if utility.has_collection(metadata_collection_name(collection_name)):
+        # 조회만 할 때는 스키마 업그레이드를 하지 않음 (없는 필드는 기본값, 업그레이드는 다음 쓰기에서)
+        return _query_metadata_row(get_metadata_collection(collection_name, upgrade=False))
+    if utility.has_collection(metadata_collection_name(collection_name) + UPGRADE_SUFFIX):
+        # 업그레이드가 중단된 경우 임시 컬렉션에서 조회 (복구는 다음 쓰기에서)
+        return _query_metadata_row(Collection(name=metadata_collection_name(collection_name) + UPGRADE_SUFFIX))
+
+    if is_legacy_collection(collection_name):
+        collection = Collection(name=collection_name)
+        collection.load()
+        results = collection.query(expr="set_type == 'metadata'", output_fields=METADATA_FIELD_NAMES, limit=1)
+        return results[0] if results else None
+    return None
+
+def write_metadata(collection_name, metadata):
+    """고정 key 행을 upsert 한 번으로 교체 (delete / flush 없음)"""
+    collection = get_metadata_collection(collection_name, load=False)
+    return _upsert_metadata_row(collection, metadata).primary_keys[0]
+
+def update_metadata(collection_name, **fields):
+    """기존 메타데이터에 일부 필드만 갱신 (Milvus 2.3 upsert는 전체 행이 필요하므로 기존 행과 합쳐서 기록)"""
+    existing = read_metadata(collection_name)
+    if existing is None:
+        return None
+    return write_metadata(collection_name, {**existing, **fields})
+
+## --------------- Migration --------------- ##
+def migrate_legacy_collection(collection_name, create_vector_collection, batch_size=5000):
+    """기존 17컬럼 컬렉션을 (id, set_type, class, vector) 컬렉션 + 메타데이터 컬렉션으로 분리
+
+    벡터 행을 임시 컬렉션으로 복사하고 행 수를 확인한 뒤, 기존 컬렉션을 백업 이름으로 바꾸고
+    임시 컬렉션을 원래 이름으로 바꿔 교체 (교체가 끝난 뒤에만 백업 삭제)
+    """
+    if not is_legacy_collection(collection_name):
+        return False
+    # 교체에 rename_collection이 필요하므로 Milvus 서버에서만 지원
+    if is_milvus_lite():
+        raise RuntimeError(f"'{collection_name}' uses the legacy schema; migrate it on a Milvus server "
+                           f"(rename_collection is not supported on Milvus Lite).")
+
+    legacy = Collection(name=collection_name)
+    legacy.load()
+
+    metadata = read_metadata(collection_name)
+    if metadata:
+        write_metadata(collection_name, metadata)
+
+    dim = next(int(field.params["dim"]) for field in legacy.schema.fields if field.name == "vector")
+    tmp_name = f"{collection_name}_migrating"
+    if utility.has_collection(tmp_name):
+        utility.drop_collection(tmp_name)
+    target = create_vector_collection(tmp_name, dim=dim)
+
+    # 새 컬렉션은 auto_id=False이므로 기존 id를 그대로 row key로 사용
+    copy_ids = not any(field.is_primary and field.auto_id for field in target.schema.fields)
+    iterator = legacy.query_iterator(batch_size=batch_size, expr="set_type != 'metadata'",
+                                     output_fields=["id", "set_type", "class", "vector"])
+    while True:
+        rows = iterator.next()
+        if not rows:
+            iterator.close()
+            break
+        # split별 파티션으로 나누어 삽입
+        for set_type in sorted({row["set_type"] for row in rows}):
+            split_rows = [row for row in rows if row["set_type"] == set_type]
+            if not target.has_partition(set_type):
+                target.create_partition(set_type)
+            data = [[set_type] * len(split_rows), [row["class"] for row in split_rows],
+                    [row["vector"] for row in split_rows]]
+            if copy_ids:
+                data = [[row["id"] for row in split_rows]] + data
+            target.insert(data, partition_name=set_type)
+    target.flush()
+
+    # 복사한 행 수 확인 (다르면 기존 컬렉션은 그대로 두고 중단)
+    target.load()
+    expected = legacy.query(expr="set_type != 'metadata'", output_fields=["count(*)"],
+                            consistency_level="Strong")[0]["count(*)"]
+    copied = target.query(expr="set_type != ''", output_fields=["count(*)"],
+                          consistency_level="Strong")[0]["count(*)"]
+    target.release()
+    if copied != expected:
+        utility.drop_collection(tmp_name)
+        raise RuntimeError(f"Migration of '{collection_name}' copied {copied:,} of {expected:,} rows; "
+                           f"the legacy collection was left unchanged.")
+
+    legacy.release()
+    backup_name = f"{collection_name}_legacy_backup"
+    if utility.has_collection(backup_name):
+        utility.drop_collection(backup_name)
+    utility.rename_collection(collection_name, backup_name)
+    try:
+        utility.rename_collection(tmp_name, collection_name)
+    except Exception:
+        utility.rename_collection(backup_name, collection_name)
+        raise
+    utility.drop_collection(backup_name)
+    return True
@@ -0,0 +1,117 @@
+import os
+import time
+import threading
+from pymilvus import connections, utility
+
+# 연결 설정 (환경변수로 변경 가능)
+# MILVUS_URI가 .db 파일 경로이면 Milvus Lite 로컬 파일을 서버 대신 사용
+MILVUS_ALIAS = os.environ.get("MILVUS_ALIAS", "default")
+MILVUS_HOST = os.environ.get("MILVUS_HOST", "localhost")
+MILVUS_PORT = os.environ.get("MILVUS_PORT", "19530")
+MILVUS_URI = os.environ.get("MILVUS_URI", "")
+MILVUS_CONNECT_RETRIES = int(os.environ.get("MILVUS_CONNECT_RETRIES", 5))
+MILVUS_BACKOFF_SECONDS = 0.5
+# 마지막 확인 후 이 시간이 지나면 다음 사용 시 서버 상태를 다시 확인
+MILVUS_HEALTH_CHECK_INTERVAL = 30
+
+def is_lite_uri(uri):
+    return bool(uri) and uri.endswith(".db")
+
+## --------------- Connection Manager --------------- ##
+class MilvusConnection:
+    """처음 사용할 때 연결하고 이후에는 같은 alias 연결을 재사용하는 연결 관리자
+
+    health check 간격이 지난 뒤 사용하면 서버 버전 조회로 연결 상태를 확인하고,
+    끊어진 경우 지수 backoff로 재연결
+    """
+    def __init__(self, alias=MILVUS_ALIAS, host=MILVUS_HOST, port=MILVUS_PORT, uri=MILVUS_URI,
+                 retries=MILVUS_CONNECT_RETRIES, backoff=MILVUS_BACKOFF_SECONDS,
+                 health_check_interval=MILVUS_HEALTH_CHECK_INTERVAL):
+        self.alias = alias
+        self.host = host
+        self.port = str(port)
+        self.uri = uri
+        self.retries = retries
+        self.backoff = backoff
+        self.health_check_interval = health_check_interval
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+
+    @property
+    def is_lite(self):
+        return is_lite_uri(self.uri)
+
+    @property
+    def address(self):
+        return self.uri or f"{self.host}:{self.port}"
+
+    def _connect_params(self):
+        if self.uri:
+            # Milvus Lite 파일은 상위 디렉터리가 있어야 생성 가능
+            if self.is_lite and os.path.dirname(self.uri):
+                os.makedirs(os.path.dirname(self.uri), exist_ok=True)
+            return {"uri": self.uri}
+        return {"host": self.host, "port": self.port}
+
+    def is_healthy(self):
+        try:
+            utility.get_server_version(using=self.alias)
+            return True
+        except Exception:
+            return False
+
+    def connect(self):
+        """연결된 alias 반환 (필요할 때만 연결/재연결)"""
+        with self._lock:
+            now = time.monotonic()
+            if connections.has_connection(self.alias):
+                if now - self._checked_at < self.health_check_interval:
+                    return self.alias
+                if self.is_healthy():
+                    self._checked_at = now
+                    return self.alias
+                connections.disconnect(self.alias)
+
+            last_error = None
+            for attempt in range(self.retries):
+                try:
+                    connections.connect(self.alias, **self._connect_params())
+                    if self.is_healthy():
+                        self._checked_at = time.monotonic()
+                        return self.alias
+                    raise ConnectionError(f"Milvus at {self.address} did not answer the health check")
+                except Exception as e:
+                    last_error = e
+                    if connections.has_connection(self.alias):
+                        connections.disconnect(self.alias)
+                    if attempt < self.retries - 1:
+                        time.sleep(self.backoff * 2 ** attempt)
+            raise ConnectionError(f"Could not connect to Milvus at {self.address} "
+                                  f"after {self.retries} attempts: {last_error}")
+
+    def close(self):
+        with self._lock:
+            if connections.has_connection(self.alias):
+                connections.disconnect(self.alias)
+            self._checked_at = 0.0
+
+_connection = None
+_connection_lock = threading.Lock()
+
+def get_milvus_connection(**overrides):
+    """프로세스 전체에서 공유하는 연결 관리자 (설정을 넘기면 그 설정으로 교체)"""
+    global _connection
+    overrides = {k: v for k, v in overrides.items() if v is not None}
+    with _connection_lock:
+        if _connection is None or overrides:
+            if _connection is not None:
+                _connection.close()
+            _connection = MilvusConnection(**overrides)
+        return _connection
+
+def ensure_milvus_connection():
+    """Milvus를 사용하기 직전에 호출 (import 시점에는 연결하지 않음)"""
+    return get_milvus_connection().connect()
+
+def is_milvus_lite():
+    return get_milvus_connection().is_lite
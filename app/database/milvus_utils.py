@@ -0,0 +1,183 @@
+import json
+import numpy as np
+from pymilvus import utility, Partition, DataType
+from .milvus_connection import is_milvus_lite
+
+# split(set_type)별 파티션 이름
+SPLIT_PARTITIONS = ["train", "valid", "test"]
+DEFAULT_PARTITION = "_default"
+
+## --------------- Partitions --------------- ##
+def ensure_partition(collection, partition_name):
+    if not collection.has_partition(partition_name):
+        collection.create_partition(partition_name)
+    return partition_name
+
+def is_partitioned(collection):
+    """모든 행이 split 파티션에 저장된 컬렉션인지 확인 (파티션 도입 전 컬렉션은 _default에 행이 있음)"""
+    return Partition(collection, DEFAULT_PARTITION).num_entities == 0
+
+def get_split_partitions(collection):
+    """행이 있는 split 파티션 이름 목록 (컬렉션 스캔 없이 파티션 통계만 사용)"""
+    return [
+        partition.name for partition in collection.partitions
+        if partition.name != DEFAULT_PARTITION and partition.num_entities > 0
+    ]
+
+## --------------- Vector Storage --------------- ##
+# float16 / bfloat16 벡터는 행당 메모리가 절반 (768-d: 3KB -> 1.5KB), Milvus 2.4 이상 필요
+VECTOR_STORAGE_TYPES = ["float32", "float16", "bfloat16"]
+VECTOR_DATA_TYPES = {
+    "float32": DataType.FLOAT_VECTOR,
+    "float16": DataType.FLOAT16_VECTOR,
+    "bfloat16": DataType.BFLOAT16_VECTOR,
+}
+
+def get_vector_storage_options():
+    """선택 가능한 벡터 저장 타입 (Milvus Lite는 FLAT + float32만 사용)"""
+    return ["float32"] if is_milvus_lite() else VECTOR_STORAGE_TYPES
+
+def get_vector_storage(collection):
+    for field in collection.schema.fields:
+        if field.name == "vector":
+            for storage, dtype in VECTOR_DATA_TYPES.items():
+                if field.dtype == dtype:
+                    return storage
+    return "float32"
+
+def encode_vectors(vectors, storage="float32"):
+    """insert용 벡터 변환 (float16 / bfloat16은 행별 bytes)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if storage == "float32":
+        return vectors
+    if storage == "float16":
+        return [row.tobytes() for row in vectors.astype(np.float16)]
+    # bfloat16: float32 상위 16비트 (round-to-nearest-even)
+    bits = np.ascontiguousarray(vectors).view(np.uint32)
+    rounded = ((bits + 0x7FFF + ((bits >> 16) & 1)) >> 16).astype(np.uint16)
+    return [row.tobytes() for row in rounded]
+
+def decode_vector(value, storage="float32"):
+    """query 결과 벡터를 float32 numpy 배열로 변환 (float16 / bfloat16은 [bytes]로 반환됨)"""
+    if storage == "float32":
+        return np.asarray(value, dtype=np.float32)
+    raw = value[0] if isinstance(value, list) else value
+    if storage == "float16":
+        return np.frombuffer(raw, dtype=np.float16).astype(np.float32)
+    return (np.frombuffer(raw, dtype=np.uint16).astype(np.uint32) << 16).view(np.float32)
+
+def cast_to_storage(vectors, storage="float32"):
+    """저장 정밀도로 반올림한 뒤 다시 float32로 올린 벡터 (정확도 확인용)"""
+    if storage == "float32":
+        return np.asarray(vectors, dtype=np.float32)
+    return np.stack([decode_vector(value, storage) for value in encode_vectors(vectors, storage)])
+
+## --------------- Vector Index --------------- ##
+VECTOR_INDEX_TYPES = ["auto", "FLAT", "IVF_FLAT", "HNSW", "IVF_SQ8", "IVF_PQ"]
+VECTOR_METRICS = ["L2", "COSINE"]
+# 이보다 작은 컬렉션은 brute-force(FLAT)가 가장 빠르고 정확
+FLAT_MAX_ROWS = 10_000
+# 쿼리 노드에 인덱스를 올릴 수 있는 메모리 예산
+INDEX_MEMORY_BUDGET_BYTES = 8 * 1024 ** 3  # 8GB
+
+def select_index_params(num_rows, dim, metric_type="L2", index_type="auto",
+                        memory_budget_bytes=INDEX_MEMORY_BUDGET_BYTES, latency_sensitive=False):
+    """행 수와 메모리 예산으로 인덱스 종류와 파라미터 결정
+
+    FLAT(작은 컬렉션) -> HNSW(지연 시간 우선, 원본 + 그래프가 예산 안) -> IVF_FLAT(원본이 예산 안)
+    -> IVF_SQ8(int8 양자화, 약 1/4) -> IVF_PQ(그 이상), IVF 계열 nlist는 sqrt(N)
+    """
+    raw_bytes = num_rows * dim * 4
+    # Milvus Lite는 FLAT 인덱스만 지원
+    if is_milvus_lite():
+        index_type = "FLAT"
+    if index_type == "auto":
+        if num_rows < FLAT_MAX_ROWS:
+            index_type = "FLAT"
+        elif latency_sensitive and raw_bytes * 1.5 <= memory_budget_bytes:
+            index_type = "HNSW"
+        elif raw_bytes <= memory_budget_bytes:
+            index_type = "IVF_FLAT"
+        elif raw_bytes / 4 <= memory_budget_bytes:
+            index_type = "IVF_SQ8"
+        else:
+            index_type = "IVF_PQ"
+
+    if index_type == "FLAT":
+        params = {}
+    elif index_type == "HNSW":
+        params = {"M": 16 if dim <= 256 else 32, "efConstruction": 200}
+    else:
+        params = {"nlist": int(min(65536, max(16, round(num_rows ** 0.5))))}
+        if index_type == "IVF_PQ":
+            # sub-vector 수 m은 dim의 약수여야 함 (sub-vector당 약 8차원)
+            params["m"] = next(m for m in range(max(1, dim // 8), 0, -1) if dim % m == 0)
+            params["nbits"] = 8
+    return {"index_type": index_type, "metric_type": metric_type, "params": params}
+
+def get_vector_index_params(collection, field_name="vector"):
+    for index in collection.indexes:
+        if index.field_name == field_name:
+            return index.params
+    return None
+
+def get_vector_index_name(collection, field_name="vector"):
+    for index in collection.indexes:
+        if index.field_name == field_name:
+            return index.index_name
+    return ""
+
+def build_vector_index(collection, metric_type="L2", index_type="auto",
+                       memory_budget_bytes=INDEX_MEMORY_BUDGET_BYTES, latency_sensitive=False):
+    """삽입이 끝난 컬렉션에 크기에 맞는 벡터 인덱스를 한 번에 생성 (기존 인덱스와 같으면 유지)"""
+    collection.flush()
+    dim = next(int(field.params["dim"]) for field in collection.schema.fields if field.name == "vector")
+    index_params = select_index_params(collection.num_entities, dim, metric_type=metric_type, index_type=index_type,
+                                       memory_budget_bytes=memory_budget_bytes, latency_sensitive=latency_sensitive)
+
+    current = get_vector_index_params(collection)
+    if current is not None:
+        current_params = current.get("params", {})
+        if isinstance(current_params, str):
+            current_params = json.loads(current_params)
+        if (current.get("index_type") == index_params["index_type"]
+                and current.get("metric_type") == index_params["metric_type"]
+                and {k: int(v) for k, v in current_params.items()} == index_params["params"]):
+            return index_params
+        # 로드된 컬렉션은 인덱스를 삭제할 수 없으므로 먼저 해제
+        collection.release()
+        collection.drop_index(index_name=get_vector_index_name(collection))
+
+    collection.create_index(field_name="vector", index_params=index_params)
+    utility.wait_for_index_building_complete(collection.name)
+    return index_params
+
+def ensure_vector_index(collection, **index_kwargs):
+    """인덱스 없이 로드할 수 없으므로 (삽입 중단 등으로) 인덱스가 없으면 생성"""
+    if get_vector_index_params(collection) is None:
+        return build_vector_index(collection, **index_kwargs)
+    return get_vector_index_params(collection)
+
+## --------------- Paginated Query --------------- ##
+# query_iterator 한 페이지의 행 수 (Milvus 최대 16384)
+QUERY_PAGE_SIZE = 4096
+QUERY_MAX_PAGE_SIZE = 16384
+
+def count_rows(collection, expr="", partition_names=None, consistency_level=None):
+    """조건에 맞는 행 수 (count(*) 쿼리, 행을 가져오지 않음)"""
+    kwargs = {"consistency_level": consistency_level} if consistency_level else {}
+    results = collection.query(expr=expr, output_fields=["count(*)"], partition_names=partition_names, **kwargs)
+    return int(results[0]["count(*)"]) if results else 0
+
+def iter_query_pages(collection, expr="", output_fields=None, page_size=QUERY_PAGE_SIZE, partition_names=None):
+    """query_iterator로 조건에 맞는 모든 행을 page_size 단위로 반환 (limit 없이 전체 조회)"""
+    iterator = collection.query_iterator(batch_size=min(page_size, QUERY_MAX_PAGE_SIZE), expr=expr,
+                                         output_fields=output_fields, partition_names=partition_names)
+    try:
+        while True:
+            page = iterator.next()
+            if not page:
+                break
+            yield page
+    finally:
+        iterator.close()
@@ -0,0 +1,80 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# 동시에 실행할 insert 작업 수 / 대기 중인 chunk 수 상한 (메모리 = max_pending x chunk_rows)
+MILVUS_WRITE_WORKERS = 4
+MILVUS_MAX_PENDING = 8
+
+## --------------- Concurrent Writer --------------- ##
+class MilvusWriter:
+    """train/valid/test chunk 삽입을 하나의 스레드 풀에서 동시에 실행하는 writer
+
+    대기 중인 chunk가 max_pending개가 되면 submit이 막혀 임베딩 쪽 속도를 늦추고(back-pressure),
+    split별로 앞에서부터 연속으로 반영된 offset만 on_commit으로 알려 checkpoint가 구멍 없이 기록되게 함
+    """
+    def __init__(self, write_fn, max_workers=MILVUS_WRITE_WORKERS, max_pending=MILVUS_MAX_PENDING):
+        self.write_fn = write_fn
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="milvus-writer")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._splits = {}
+        self._started_at = None
+        self._finished_at = None
+
+    def begin(self, split, offset=0, on_commit=None):
+        with self._lock:
+            self._splits[split] = {"futures": [], "done": {}, "offset": offset, "rows": 0,
+                                   "error": None, "on_commit": on_commit}
+
+    def submit(self, split, start, end, *args, **kwargs):
+        """rows [start, end) 삽입 작업 등록 (대기 작업이 가득 차면 빈 자리가 생길 때까지 대기)"""
+        state = self._splits[split]
+        self._slots.acquire()
+        if state["error"] is not None:
+            self._slots.release()
+            raise state["error"]
+        if self._started_at is None:
+            self._started_at = time.time()
+        future = self._executor.submit(self._write, split, start, end, args, kwargs)
+        future.add_done_callback(lambda _: self._slots.release())
+        state["futures"].append(future)
+        return future
+
+    def _write(self, split, start, end, args, kwargs):
+        state = self._splits[split]
+        try:
+            results = self.write_fn(*args, **kwargs)
+        except Exception as e:
+            state["error"] = e
+            raise
+
+        with self._lock:
+            state["rows"] += end - start
+            state["done"][start] = end
+            while state["offset"] in state["done"]:
+                state["offset"] = state["done"].pop(state["offset"])
+            self._finished_at = time.time()
+            if state["on_commit"] is not None:
+                state["on_commit"](state["offset"])
+        return results
+
+    def has_error(self, split):
+        return self._splits[split]["error"] is not None
+
+    def wait(self, split):
+        """split의 모든 삽입이 끝날 때까지 대기 후 결과 반환 (실패한 작업이 있으면 예외)"""
+        results = []
+        for future in self._splits[split]["futures"]:
+            results.extend(future.result())
+        return results
+
+    def stats(self):
+        with self._lock:
+            rows = {split: state["rows"] for split, state in self._splits.items()}
+        elapsed = (self._finished_at - self._started_at) if self._started_at and self._finished_at else 0.0
+        total = sum(rows.values())
+        return {"rows": total, "splits": rows, "elapsed": elapsed, "rows_per_sec": total / max(elapsed, 1e-6)}
+
+    def close(self):
+        self._executor.shutdown(wait=True)
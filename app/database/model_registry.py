@@ -0,0 +1,124 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# 동시에 메모리에 유지할 최대 모델 수
+MODEL_REGISTRY_MAX_MODELS = 2
+
+## --------------- Model Registry --------------- ##
+class ModelRegistry:
+    """프로세스 전체에서 (model_name, device, backend)별 모델 인스턴스를 하나만 유지하는 레지스트리
+
+    사용 중인 세션 수를 참조 카운트로 관리하고, 최대 개수를 넘으면
+    참조가 없는 모델 중 가장 오래 사용되지 않은(LRU) 것부터 해제
+    """
+    def __init__(self, max_models=MODEL_REGISTRY_MAX_MODELS):
+        self.max_models = max_models
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # 로드 중인 key -> Future (같은 모델을 동시에 두 번 로드하지 않음)
+        self._loading = {}
+
+    def acquire(self, key, loader):
+        """key에 해당하는 (tokenizer, model) 반환, 없으면 loader()로 로드 후 등록
+
+        로드(다운로드/ONNX export/양자화)는 lock 밖에서 실행하고, 같은 key를 동시에 요청한
+        세션은 key별 Future로 첫 로드 결과를 기다림 (다른 key의 acquire/release는 막지 않음)
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    return self._checkout(key, entry)
+                future = self._loading.get(key)
+                owner = future is None
+                if owner:
+                    future = self._loading[key] = Future()
+
+            if not owner:
+                # 다른 세션의 로드 완료 후 등록된 항목을 다시 확인 (로드 실패 시 예외 전달)
+                future.result()
+                continue
+
+            try:
+                tokenizer, model = loader()
+            except BaseException as e:
+                with self._lock:
+                    del self._loading[key]
+                future.set_exception(e)
+                raise
+
+            with self._lock:
+                entry = {
+                    "tokenizer": tokenizer,
+                    "model": model,
+                    "refs": 0,
+                    "bytes": estimate_model_bytes(model),
+                    "loaded_at": time.time(),
+                }
+                self._entries[key] = entry
+                del self._loading[key]
+                result = self._checkout(key, entry)
+            future.set_result(None)
+            return result
+
+    def _checkout(self, key, entry):
+        entry["refs"] += 1
+        entry["last_used"] = time.time()
+        self._entries.move_to_end(key)
+        self._evict()
+        return entry["tokenizer"], entry["model"]
+
+    def release(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["refs"] > 0:
+                entry["refs"] -= 1
+            self._evict()
+
+    def _evict(self):
+        for key in list(self._entries.keys()):
+            if len(self._entries) <= self.max_models:
+                break
+            if self._entries[key]["refs"] == 0:
+                del self._entries[key]
+                _empty_device_cache(key)
+
+    def report(self):
+        """사이드바 표시용 모델별 메모리 사용량"""
+        with self._lock:
+            return [
+                {
+                    "model": key[0],
+                    "device": key[1],
+                    "backend": key[2],
+                    "refs": entry["refs"],
+                    "memory_mb": round(entry["bytes"] / 1024 ** 2, 1),
+                    "last_used": time.strftime("%H:%M:%S", time.localtime(entry["last_used"])),
+                }
+                for key, entry in self._entries.items()
+            ]
+
+def estimate_model_bytes(model):
+    """파라미터/버퍼 텐서 크기 합 (ONNX 세션은 모델 파일 크기로 추정)"""
+    onnx_path = getattr(model, "onnx_path", None)
+    if onnx_path and os.path.exists(onnx_path):
+        return os.path.getsize(onnx_path)
+    if not hasattr(model, "state_dict"):
+        return 0
+
+    total = 0
+    for value in model.state_dict().values():
+        # dynamic int8 Linear의 packed params는 (weight, bias) 튜플로 저장됨
+        tensors = value if isinstance(value, tuple) else (value,)
+        for tensor in tensors:
+            if hasattr(tensor, "element_size"):
+                total += tensor.numel() * tensor.element_size()
+    return total
+
+def _empty_device_cache(key):
+    if key[1] == "cuda":
+        import torch
+        torch.cuda.empty_cache()
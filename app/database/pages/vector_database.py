@@ -1,55 +1,74 @@
 import os
 import time
 import json
+from collections import deque
 import numpy as np
 import pandas as pd
 import streamlit as st
-from pymilvus import utility, Collection, CollectionSchema, FieldSchema, DataType, connections
-from ..utils import EmbeddingPipeline, split_columns, get_data_from_session
-
-# Milvus 서버에 연결
-connections.connect("default", host="localhost", port="19530")
+from pymilvus import utility, Collection, Partition, CollectionSchema, FieldSchema, DataType
+from ..milvus_connection import ensure_milvus_connection, is_milvus_lite
+from ..metadata_store import read_metadata, write_metadata, migrate_legacy_collection
+from ..milvus_utils import (SPLIT_PARTITIONS, VECTOR_INDEX_TYPES, VECTOR_METRICS, get_vector_storage_options,
+                            VECTOR_DATA_TYPES, ensure_partition, build_vector_index,
+                            get_vector_storage, encode_vectors)
+from ..bulk_insert import BulkFileWriter, start_bulk_insert, finish_bulk_insert, use_bulk_insert
+from ..milvus_writer import MilvusWriter, MILVUS_WRITE_WORKERS, MILVUS_MAX_PENDING
+from ..ingest_checkpoint import IngestCheckpoint, make_row_keys, content_digest
+from ..split_manifest import build_split_manifest, write_split_manifest, row_key_checksum
+from ..utils import (EmbeddingPipeline, split_columns, get_data_from_session, get_embedding_cache,
+                     EMBEDDING_BACKENDS, EMBEDDING_BATCHING_MODES, EMBEDDING_MAX_TOKENS, POOLING_METHODS,
+                     fit_projection, apply_projection)
 
 # ----------------------------- Vector Database Functions -----------------------------
 ## MilvusDB Schema
-def create_collection(collection_name):
-    """통합 컬렉션 생성 (데이터 + 메타데이터)"""
+def create_collection(collection_name, dim=768, vector_storage="float32"):
+    """벡터 컬렉션 생성 (id, set_type, class, vector), 메타데이터는 별도 컬렉션에 저장
+
+    id는 텍스트 해시로 만든 결정적 row key (재실행 시 upsert로 중복 방지)
+    vector_storage="float16" / "bfloat16"이면 벡터를 절반 크기로 저장 (Milvus 2.4 이상)
+    벡터 인덱스는 삽입이 끝난 뒤 build_vector_index로 크기에 맞게 생성
+    """
+    # 기존 17컬럼 스키마는 벡터/메타데이터 컬렉션으로 분리
+    if migrate_legacy_collection(collection_name, create_collection):
+        st.write(f"🔀 Migrated collection to the lean schema: {collection_name}")
+
+    if vector_storage != "float32" and is_milvus_lite():
+        raise ValueError(f"{vector_storage} vector storage is not supported on Milvus Lite. Use float32.")
+
     if not utility.has_collection(collection_name):
         fields = [
-            FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=True),
+            FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=False),
             FieldSchema(name="set_type", dtype=DataType.VARCHAR, max_length=20),
             FieldSchema(name="class", dtype=DataType.VARCHAR, max_length=50), 
-            FieldSchema(name="vector", dtype=DataType.FLOAT_VECTOR, dim=768),
-            # 메타데이터 필드들
-            FieldSchema(name="dataset_name", dtype=DataType.VARCHAR, max_length=100),
-            FieldSchema(name="summary_dict", dtype=DataType.VARCHAR, max_length=20000),
-            FieldSchema(name="data_previews", dtype=DataType.VARCHAR, max_length=20000),
-            FieldSchema(name="class_dist_path", dtype=DataType.VARCHAR, max_length=500),
-            FieldSchema(name="doc_len_path", dtype=DataType.VARCHAR, max_length=500),
-            FieldSchema(name="doc_len_table", dtype=DataType.VARCHAR, max_length=10000),
-            FieldSchema(name="wordcloud_path", dtype=DataType.VARCHAR, max_length=500),
-            FieldSchema(name="timestamp", dtype=DataType.INT64),
-            # 데이터 드리프트 필드
-            FieldSchema(name="dimension", dtype=DataType.FLOAT),
-            FieldSchema(name="embedding_size", dtype=DataType.VARCHAR, max_length=5000),
-            FieldSchema(name="original_distance_path", dtype=DataType.VARCHAR, max_length=500),
-            FieldSchema(name="PCA_distance_path", dtype=DataType.VARCHAR, max_length=500),
-            FieldSchema(name="PCA_visualization_path", dtype=DataType.VARCHAR, max_length=500),
-            FieldSchema(name="drift_score_summary", dtype=DataType.VARCHAR, max_length=10000),
-
+            FieldSchema(name="vector", dtype=VECTOR_DATA_TYPES[vector_storage], dim=dim),
         ]
-        schema = CollectionSchema(fields=fields, description="Text Embeddings with Metadata")
+        schema = CollectionSchema(fields=fields, description="Text Embeddings")
         collection = Collection(name=collection_name, schema=schema)
-        collection.create_index(
-            field_name="vector", 
-            index_params={"index_type": "IVF_FLAT", "metric_type": "L2", "params": {"nlist": 128}}
-        )
         st.write(f"✅ Created collection: {collection_name}")
     else:
         collection = Collection(name=collection_name)
-    collection.load()
+        if get_vector_dim(collection) != dim:
+            raise ValueError(f"Collection '{collection_name}' stores {get_vector_dim(collection)}-d vectors, "
+                             f"but {dim}-d embeddings were given. Remove the collection or match the projection.")
+        if get_vector_storage(collection) != vector_storage:
+            raise ValueError(f"Collection '{collection_name}' stores {get_vector_storage(collection)} vectors, "
+                             f"but {vector_storage} storage was requested. Remove the collection or match the storage.")
+    # split별 파티션 (삽입에는 로드가 필요 없으므로 여기서 load하지 않음)
+    for partition_name in SPLIT_PARTITIONS:
+        ensure_partition(collection, partition_name)
     return collection
 
+## auto_id=False(결정적 row key) 컬렉션인지 확인 (이전 컬렉션은 auto_id=True)
+def uses_row_keys(collection):
+    return not any(field.is_primary and field.auto_id for field in collection.schema.fields)
+
+## 컬렉션 스키마에서 벡터 차원 조회
+def get_vector_dim(collection):
+    for field in collection.schema.fields:
+        if field.name == "vector":
+            return int(field.params["dim"])
+    return 768
+
 # ----------------------------------- Prepare Metadata ----------------------------------- 
 ## 객체를 JSON 직렬화 가능하게 변환: 복잡한 객체들을 문자열이나 기본 타입으로 변환
 def make_json_serializable(obj):
@@ -196,140 +215,84 @@ def prepare_metadata():
 
 # ----------------------------------- Save Metadata ----------------------------------- 
 def save_metadata_to_vectordb(collection_name):
-    collection = Collection(name=collection_name)
-    collection.load()
-        
-    # 기존 메타데이터 삭제
-    metadata_results = collection.query(
-            expr="set_type == 'metadata'",
-            output_fields=["id"],
-            limit=1
-        )
-        
-    if metadata_results:
-        metadata_id = metadata_results[0]["id"]
-        collection.delete(f"id == {metadata_id}")
-        
-    # 새 메타데이터 준비
+    # 메타데이터 컬렉션의 행을 새 메타데이터로 교체
     metadata = prepare_metadata()
-    dummy_vector = [0.0] * 768
-        
-    # 메타데이터 삽입 (데이터 드리프트 필드 포함)
-    data = [
-            ["metadata"],
-            ["metadata"],
-            [dummy_vector],
-            [metadata["dataset_name"]],
-            [metadata["summary_dict"]],
-            [metadata["data_previews"]],
-            [metadata["class_dist_path"]],
-            [metadata["doc_len_path"]],
-            [metadata["doc_len_table"]],
-            [metadata["wordcloud_path"]],
-            [metadata["timestamp"]],
-            # 데이터 드리프트 필드들을 빈 값으로 초기화
-            [0.0],  # dimension
-            [""],   # embedding_size
-            [""],   # original_distance_path
-            [""],   # PCA_distance_path
-            [""],   # PCA_visualization_path
-            [""],   # drift_score_summary
-        ]
-        
-    fields = ["set_type", "class", "vector", "dataset_name", "summary_dict", 
-                 "data_previews", "class_dist_path", "doc_len_path", "doc_len_table", "wordcloud_path", "timestamp",
-                 "dimension", "embedding_size", "original_distance_path", 
-                 "PCA_distance_path", "PCA_visualization_path", "drift_score_summary"]
-        
-    result = collection.insert(data, fields=fields)
-    collection.flush()
+    primary_key = write_metadata(collection_name, metadata)
         
     st.success(f"✅ 메타데이터가 저장되었습니다.")
-    return result.primary_keys[0]
+    return primary_key
 
 # ----------------------------------- Save Vector ----------------------------------- 
 ## text Embedding 벡터를 batch 단위로 벡터DB에 저장
-def insert_vectors(collection_name, vectors, set_type, class_labels, batch_size=500, metadata=None):
+## mode="per_batch" : batch_size 행마다 insert 후 flush (기존 방식)
+## mode="bulk"      : max_batch_bytes 기준 batch, 비동기 insert를 max_inflight개까지 겹쳐 실행, flush는 마지막에 한 번
+## ids가 있으면 row key와 함께 저장, upsert=True이면 같은 key의 기존 행을 덮어씀 (재실행 시 중복 방지)
+def insert_vectors(collection_name, vectors, set_type, class_labels, batch_size=500, metadata=None, flush=True,
+                   mode="per_batch", max_batch_bytes=16 * 1024 ** 2, max_inflight=4, ids=None, upsert=False):
     collection = Collection(name=collection_name)
+    partition_name = ensure_partition(collection, set_type)
+    vector_storage = get_vector_storage(collection)
     class_labels = [str(label) if not isinstance(label, str) else label for label in class_labels]
     total = len(vectors)
-    ids = []
+    write = collection.upsert if upsert else collection.insert
+    results = []
     
-    # 메타데이터 삽입 (train 데이터와 함께 처리)
+    # 메타데이터 저장 (train 데이터와 함께 처리, 별도 메타데이터 컬렉션)
     if metadata and set_type == "train":
-        dummy_vector = [0.0] * 768
-        
-        metadata_data = [
-            ["metadata"],
-            ["metadata"],
-            [dummy_vector],
-            [metadata["dataset_name"]],
-            [metadata["summary_dict"]],
-            [metadata["data_previews"]], 
-            [metadata["class_dist_path"]],
-            [metadata["doc_len_path"]],
-            [metadata["doc_len_table"]],
-            [metadata["wordcloud_path"]],
-            [metadata["timestamp"]],
-            # Drift 관련 필드들을 빈 값으로 초기화
-            [0.0],  # dimension
-            [""],   # embedding_size
-            [""],   # original_distance_path
-            [""],   # PCA_distance_path
-            [""],   # PCA_visualization_path
-            [""],   # drift_score_summary
-        ]
-        
-        fields = ["set_type", "class", "vector", "dataset_name", "summary_dict", 
-                 "data_previews", "class_dist_path", "doc_len_path", "doc_len_table", "wordcloud_path", "timestamp",
-                 "dimension", "embedding_size", "original_distance_path", 
-                 "PCA_distance_path", "PCA_visualization_path", "drift_score_summary"]
-        
-        metadata_ids = collection.insert(metadata_data, fields=fields)
-        ids.append(metadata_ids)
-        collection.flush()
+        write_metadata(collection_name, metadata)
     
     # 일반 데이터 삽입
+    if mode == "bulk":
+        batch_size = max(1, max_batch_bytes // estimate_row_bytes(vectors, class_labels))
+    inflight = deque()
     for i in range(0, total, batch_size):
-        batch_vectors = vectors[i:i+batch_size]
+        batch_vectors = encode_vectors(vectors[i:i+batch_size], vector_storage)
         batch_labels = class_labels[i:i+batch_size]
         batch_set_type = [set_type] * len(batch_vectors)
-        
-        # 메타데이터 필드들은 빈 값으로 설정
-        empty_metadata = [""] * len(batch_vectors)
-        zero_timestamp = [0] * len(batch_vectors)
-        zero_dimension = [0.0] * len(batch_vectors)  # Drift 필드용
-        
-        data = [
-            batch_set_type,
-            batch_labels,
-            batch_vectors,
-            empty_metadata,  # dataset_name
-            empty_metadata,  # summary_dict
-            empty_metadata,  # data_previews
-            empty_metadata,  # class_dist_path
-            empty_metadata,  # doc_len_path
-            empty_metadata,  # doc_len_table
-            empty_metadata,  # wordcloud_path
-            zero_timestamp,  # timestamp
-            zero_dimension,  # dimension
-            empty_metadata,  # embedding_size
-            empty_metadata,  # original_distance_path
-            empty_metadata,  # PCA_distance_path
-            empty_metadata,  # PCA_visualization_path
-            empty_metadata,  # drift_score_summary
-        ]
-        
-        fields = ["set_type", "class", "vector", "dataset_name", "summary_dict", 
-                 "data_previews", "class_dist_path", "doc_len_path", "doc_len_table", "wordcloud_path", "timestamp",
-                 "dimension", "embedding_size", "original_distance_path", 
-                 "PCA_distance_path", "PCA_visualization_path", "drift_score_summary"]
-        
-        batch_ids = collection.insert(data, fields=fields)
-        ids.append(batch_ids)
+        data = [batch_set_type, batch_labels, batch_vectors]
+        fields = ["set_type", "class", "vector"]
+        if ids is not None:
+            data = [list(ids[i:i+batch_size])] + data
+            fields = ["id"] + fields
+        
+        if mode == "bulk":
+            inflight.append(write(data, partition_name=partition_name, fields=fields, _async=True))
+            if len(inflight) >= max_inflight:
+                results.append(inflight.popleft().result())
+            continue
+
+        batch_result = write(data, partition_name=partition_name, fields=fields)
+        results.append(batch_result)
+        if flush:
+            collection.flush()
+
+    while inflight:
+        results.append(inflight.popleft().result())
+    if mode == "bulk" and flush:
         collection.flush()
     
-    return ids
+    return results
+
+## insert / upsert 결과의 반영 행 수
+def mutation_count(result):
+    return max(result.insert_count, getattr(result, "upsert_count", 0))
+
+## 한 행의 insert payload 크기 추정 (벡터 + class 라벨 + set_type)
+def estimate_row_bytes(vectors, class_labels):
+    dim = len(vectors[0]) if len(vectors) > 0 else 0
+    label_bytes = max((len(label.encode("utf-8")) for label in class_labels[:1000]), default=0)
+    return dim * 4 + label_bytes + 32
+
+## flush된 segment 수 (작은 segment가 얼마나 생겼는지 확인용)
+## 삽입 시점에는 컬렉션을 로드하지 않으므로 쿼리 노드 정보 대신 저장된(persistent) segment 정보 사용
+def get_segment_count(collection_name):
+    # Milvus Lite에는 segment 정보 API가 없음
+    if is_milvus_lite():
+        return None
+    try:
+        return len(utility.get_persistent_segment_info(collection_name))
+    except Exception:
+        return None
 
 # ----------------------------------- Load Metadata ----------------------------------- 
 ## JSON
@@ -338,23 +301,10 @@ def load_metadata_from_vectordb(collection_name):
         if not utility.has_collection(collection_name):
             return None
         
-        collection = Collection(name=collection_name)
-        collection.load()
-        
         # 메타데이터 조회 (데이터 드리프트 필드 포함)
-        results = collection.query(
-            expr="set_type == 'metadata'",
-            output_fields=["dataset_name", "summary_dict", "data_previews", "class_dist_path", 
-                          "doc_len_path", "doc_len_table", "wordcloud_path", "timestamp",
-                          "dimension", "embedding_size", "original_distance_path", 
-                          "PCA_distance_path", "PCA_visualization_path", "drift_score_summary"],
-            limit=1
-        )
-        
-        if not results:
+        result = read_metadata(collection_name)
+        if not result:
             return None
-            
-        result = results[0]
         
         # 세션 스테이트에 로드
         st.session_state["dataset_name"] = result["dataset_name"]
@@ -392,19 +342,189 @@ def load_metadata_from_vectordb(collection_name):
         st.error(f"❌ 메타데이터 로드 실패: {e}")
         return None
 
-## numpy 
-def load_and_save_data(data, collection_name, set_type, class_labels, metadata=None):
-    """데이터를 로드하고 벡터DB에 저장"""
-    create_collection(collection_name)
-    vectors = np.array(data)
-    ids = insert_vectors(collection_name, vectors, set_type, class_labels, metadata=metadata)
-    total_inserted = sum(batch.insert_count for batch in ids)
-    st.write(f"✅ {set_type} data (size: {total_inserted}) successfully inserted into {collection_name} collection.")
-    return ids
+## 모든 split에 공통 max_len 선택 및 비용/잘림 trade-off 표시 (임베딩 실행 전)
+# split마다 다른 max_len으로 잘라 임베딩하면 잘림 차이 자체가 드리프트로 측정되므로 하나의 값 사용
+def select_max_lens(embedding_pipeline, split_dfs, text_col, max_len_option):
+    if max_len_option != "auto":
+        max_len = int(max_len_option)
+    else:
+        # split별 추천 max_len(90 percentile 기준) 중 가장 큰 값
+        split_max_lens, token_lengths = {}, []
+        for split, df in split_dfs.items():
+            split_max_lens[split], lengths = embedding_pipeline.calculate_max_len(df, text_col)
+            token_lengths.extend(lengths)
+        max_len = max(split_max_lens.values())
+        with st.expander(f"📏 max_len = {max_len} for all splits (per split: "
+                         f"{', '.join(f'{split} {value}' for split, value in split_max_lens.items())})"):
+            tradeoff = embedding_pipeline.max_len_tradeoff(token_lengths)
+            st.dataframe(tradeoff, hide_index=True)
+
+    max_lens = {split: max_len for split in split_dfs}
+    st.session_state['embedding_max_lens'] = max_lens
+    return max_lens
+
+## 임베딩 캐시 hit/miss 표시
+def render_cache_stats(embedding_cache, stats_before):
+    stats = embedding_cache.stats()
+    hits = stats["hits"] - stats_before["hits"]
+    misses = stats["misses"] - stats_before["misses"]
+    st.session_state['embedding_cache_stats'] = stats
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Cache Hits", f"{hits:,}")
+    col2.metric("Cache Misses", f"{misses:,}")
+    col3.metric("Hit Rate", f"{hits / max(hits + misses, 1):.1%}")
+    col4.metric("Cache Size", f"{stats['size_mb']:.1f} / {stats['capacity_mb']:.0f} MB", f"{stats['evictions']:,} evicted", delta_color="off")
+
+## 임베딩과 삽입을 겹쳐서 수행: chunk 단위 임베딩 결과를 MilvusWriter 스레드 풀에 넘겨 비동기로 삽입
+## 메모리 사용량은 데이터셋 크기가 아니라 max_pending x chunk_rows로 제한됨 (writer가 없으면 queue_depth)
+## ingest_mode="bulk_insert"(auto: 큰 split)이면 chunk를 columnar 파일에 기록한 뒤 utility.do_bulk_insert로 가져옴
+## checkpoint가 있으면 chunk가 반영될 때마다 offset을 기록하고, 재실행 시 그 위치부터 이어서 삽입
+## 공유 writer를 넘기면 삽입 완료를 기다리지 않고 finish 함수를 반환 (여러 split의 삽입을 동시에 진행)
+def stream_embed_and_save_data(embedding_pipeline, dataframe, text_col, collection_name, set_type, class_labels,
+                               metadata=None, projection=None, chunk_rows=1024, queue_depth=4,
+                               ingest_mode="auto", file_format="numpy", checkpoint=None, run_config=None,
+                               writer=None, vector_storage="float32", **embed_kwargs):
+    # projection이 있으면 축소된 차원으로 저장
+    dim = projection.n_components_ if projection is not None else 768
+    is_new_collection = not utility.has_collection(collection_name)
+    collection = create_collection(collection_name, dim=dim, vector_storage=vector_storage)
+    total_rows = len(dataframe)
+    own_writer = writer is None
+
+    # 재실행 위치 결정 (새로 만든 컬렉션이면 이전 checkpoint는 무효)
+    # 데이터 내용 digest 포함: 같은 이름/행 수로 다른 데이터를 올리면 이전 진행 상황을 재사용하지 않음
+    fingerprint = IngestCheckpoint.fingerprint(**(run_config or {}), split=set_type, rows=total_rows,
+                                               max_len=embed_kwargs.get("max_len"), dim=dim,
+                                               vector_storage=vector_storage,
+                                               content=content_digest(dataframe[text_col], class_labels))
+    if checkpoint is not None and is_new_collection:
+        checkpoint.reset()
+    resume_from = checkpoint.get_offset(set_type, fingerprint) if checkpoint is not None else 0
+    if checkpoint is not None and checkpoint.is_complete(set_type, fingerprint):
+        if metadata and set_type == "train":
+            write_metadata(collection_name, metadata)
+        st.write(f"⏭️ {set_type} data ({total_rows:,} rows) is already in {collection_name}, skipped.")
+        return [] if own_writer else (lambda: [])
+    if resume_from > 0:
+        st.write(f"⏩ {set_type}: resuming from row {resume_from:,} / {total_rows:,}")
+
+    # 다른 설정/데이터로 기록된 split이면 이전 행을 지우고 처음부터 삽입 (바뀐 데이터의 이전 행이 남지 않도록)
+    # checkpoint 기록 없이 행이 있는 split(마이그레이션한 기존 auto id 행 등)도 row key가 맞지 않으므로 교체
+    cleared = False
+    if checkpoint is not None and (
+        checkpoint.is_stale(set_type, fingerprint)
+        or (not checkpoint.has_entry(set_type) and Partition(collection, set_type).num_entities > 0)
+    ):
+        collection.delete(f"set_type == '{set_type}'")
+        checkpoint.reset(set_type)
+        cleared = True
+        st.write(f"🧹 {set_type}: data or settings changed since the last run, replacing existing rows.")
+
+    # 결정적 row key: 이미 반영된 행이 다시 들어와도 upsert로 덮어써 중복이 생기지 않음
+    row_keys = make_row_keys(dataframe[text_col], set_type) if uses_row_keys(collection) else None
+    upsert = row_keys is not None and not cleared and (
+        resume_from > 0 or (checkpoint is not None and checkpoint.has_progress(set_type))
+        or Partition(collection, set_type).num_entities > 0
+    )
+
+    # bulk insert는 중복 제거를 하지 않으므로 비어 있는 파티션에 처음 쓰는 경우에만 사용 (float32 벡터만)
+    bulk_writer = None
+    if use_bulk_insert(total_rows - resume_from, ingest_mode) and not upsert and vector_storage == "float32":
+        bulk_writer = BulkFileWriter(collection_name, set_type, dim, total_rows - resume_from,
+                                     file_format=file_format, with_ids=row_keys is not None)
+        if metadata and set_type == "train":
+            write_metadata(collection_name, metadata)
+        metadata = None
+
+    if own_writer:
+        writer = MilvusWriter(insert_vectors, max_workers=1, max_pending=queue_depth)
+    on_commit = None
+    if checkpoint is not None:
+        on_commit = lambda offset: checkpoint.commit(set_type, fingerprint, offset, total_rows)
+    writer.begin(set_type, offset=resume_from, on_commit=on_commit)
+
+    started_at = time.time()
+    bulk_task = None
+    try:
+        for start in range(resume_from, total_rows, chunk_rows):
+            if writer.has_error(set_type):
+                break
+            end = min(start + chunk_rows, total_rows)
+            chunk = dataframe.iloc[start:end]
+            vectors = embedding_pipeline.generate_embeddings(chunk, text_col, **embed_kwargs)
+            if vectors is None:
+                # 건너뛰면 뒤 chunk의 offset이 checkpoint에 기록되어 재실행 시에도 이 구간이 빠지므로 중단
+                raise RuntimeError(f"Embedding failed for {set_type} rows [{start:,}, {end:,}); "
+                                   f"checkpoint stays at row {start:,} or earlier.")
+            if projection is not None:
+                vectors = apply_projection(projection, vectors)
+            keys = row_keys[start:end] if row_keys is not None else None
+
+            if bulk_writer is not None:
+                bulk_writer.append(vectors, class_labels[start:end], ids=keys)
+                continue
+            # 메타데이터는 첫 chunk와 함께 한 번만 삽입
+            writer.submit(set_type, start, end, collection_name, vectors, set_type, class_labels[start:end],
+                          metadata=metadata if start == resume_from else None, flush=False, mode="bulk",
+                          ids=keys, upsert=upsert)
+
+        # 파일 업로드 후 import task만 등록하고 완료는 finish에서 확인
+        if bulk_writer is not None:
+            bulk_task = start_bulk_insert(collection_name, set_type, bulk_writer)
+    except Exception:
+        if bulk_writer is not None and bulk_task is None:
+            bulk_writer.close()
+            bulk_writer.cleanup()
+        if own_writer:
+            writer.close()
+        raise
+
+    def finish():
+        try:
+            if bulk_task is not None:
+                # import task 상태를 polling하며 진행률 표시
+                progress_bar = st.progress(0, text=f"{set_type} bulk insert ({bulk_writer.rows:,} rows)")
+                total_inserted = finish_bulk_insert(
+                    bulk_task,
+                    on_progress=lambda state: progress_bar.progress(
+                        min(state.progress, 100) / 100,
+                        text=f"{set_type} bulk insert: {state.state_name} ({state.progress}%)"
+                    )
+                )
+                progress_bar.empty()
+                if checkpoint is not None:
+                    checkpoint.commit(set_type, fingerprint, total_rows, total_rows)
+                ids = []
+            else:
+                ids = writer.wait(set_type)
+                Collection(name=collection_name).flush()
+                total_inserted = sum(mutation_count(batch) for batch in ids)
+        finally:
+            if own_writer:
+                writer.close()
+        st.write(f"✅ {set_type} data (size: {total_inserted}) successfully inserted into {collection_name} collection "
+                 f"({total_inserted / max(time.time() - started_at, 1e-6):,.0f} rows/s, "
+                 f"{'bulk_insert' if bulk_task is not None else 'upsert' if upsert else 'insert'}, "
+                 f"segments: {get_segment_count(collection_name)}).")
+        return ids
+
+    return finish() if own_writer else finish
+
+## 세 split 동시 삽입의 전체 처리량 표시
+def render_write_stats(stats):
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Rows Written", f"{stats['rows']:,}")
+    col2.metric("Write Time", f"{stats['elapsed']:.1f} s")
+    col3.metric("Aggregate Insert Throughput", f"{stats['rows_per_sec']:,.0f} rows/s")
+    st.session_state['milvus_write_stats'] = stats
 
 #  --------------------------------------------- Main ---------------------------------------------
 def render():
     """Vector Database 페이지 렌더링"""
+    # Milvus 연결 (첫 사용 시 연결, 이후 재사용)
+    ensure_milvus_connection()
+
     if 'dataset_name' not in st.session_state:
         st.error("데이터셋 이름이 설정되지 않았습니다. Upload Data 탭에서 데이터를 업로드해주세요.")
         return
@@ -434,47 +554,140 @@ def render():
         st.error("데이터셋에 유효한 텍스트 또는 클래스 컬럼이 없습니다.")
         return
     
-    # 임베딩 파이프라인 초기화
-    embedding_pipeline = EmbeddingPipeline()
-    embedding_pipeline.load_model()
+    # 임베딩 파이프라인 초기화 (CPU 전용 환경에서는 int8 / onnx backend 선택 가능)
+    backend = st.selectbox("Embedding Backend", options=EMBEDDING_BACKENDS, index=0, key="embedding_backend")
+    pooling = st.selectbox("Pooling", options=POOLING_METHODS, index=0, key="embedding_pooling")
+    projection_dim = st.selectbox("Reduce Dimension on Write", options=["None", 64, 128, 256, 384], index=0,
+                                  key="embedding_projection_dim")
+    # 로컬 임베딩 서버 주소 (비워두면 이 프로세스에서 직접 추론)
+    server_url = st.text_input("Embedding Server URL (optional)", value="", key="embedding_server_url",
+                               placeholder="http://127.0.0.1:8765")
+    embedding_pipeline = EmbeddingPipeline(backend=backend, pooling=pooling, server_url=server_url or None)
+    num_shards = 1
+    if embedding_pipeline.device == "cpu" and not embedding_pipeline.server_url:
+        # CPU 코어 수만큼 프로세스를 나누어 임베딩
+        num_shards = st.number_input("CPU Embedding Shards", min_value=1, max_value=os.cpu_count() or 1, value=1, key="embedding_shards")
+    max_len_option = st.selectbox("Max Token Length", options=["auto", 64, 128, 256, 512], index=2, key="embedding_max_len")
+    # token_budget: 길이가 비슷한 행끼리 묶어 패딩 연산을 줄임 (배치 구성 시 토큰화 결과를 그대로 재사용)
+    batching = st.selectbox("Embedding Batching", options=EMBEDDING_BATCHING_MODES, index=0, key="embedding_batching")
+    max_tokens = st.number_input("Tokens per Batch", min_value=512, max_value=65536, value=EMBEDDING_MAX_TOKENS, step=512,
+                                 key="embedding_max_tokens", disabled=batching != "token_budget")
+    # auto: BULK_INSERT_MIN_ROWS 이상인 split만 파일 기반 bulk insert 사용
+    ingest_mode = st.selectbox("Milvus Ingest Mode", options=["auto", "insert", "bulk_insert"], index=0, key="milvus_ingest_mode")
+    # auto: 행 수/메모리 예산 기준 FLAT / IVF_FLAT / HNSW / IVF_SQ8 / IVF_PQ 선택
+    index_type = st.selectbox("Vector Index", options=VECTOR_INDEX_TYPES, index=0, key="milvus_index_type")
+    metric_type = st.selectbox("Index Metric", options=VECTOR_METRICS, index=0, key="milvus_metric_type")
+    latency_sensitive = st.checkbox("Latency-sensitive kNN (prefer HNSW)", value=False, key="milvus_latency_sensitive")
+    vector_storage = st.selectbox("Vector Storage", options=get_vector_storage_options(), index=0,
+                                  key="milvus_vector_storage",
+                                  help="float16 / bfloat16 halve vector memory (requires Milvus 2.4+, not on Milvus Lite)")
+    embedding_cache = get_embedding_cache()
+    cache_stats_before = embedding_cache.stats()
     
     collection_name = dataset_name
     metadata = prepare_metadata()
     
-    # 데이터 임베딩 및 저장
+    # 데이터 임베딩 및 저장 (임베딩과 Milvus 삽입을 병렬로 수행)
+    embed_kwargs = {"cache": embedding_cache, "num_shards": num_shards, "batching": batching, "max_tokens": int(max_tokens)}
+    # train/valid/test 삽입을 하나의 스레드 풀에서 동시에 진행 (대기 chunk 수로 back-pressure)
+    writer = MilvusWriter(insert_vectors, max_workers=MILVUS_WRITE_WORKERS, max_pending=MILVUS_MAX_PENDING)
+    ingest_kwargs = {"ingest_mode": ingest_mode, "writer": writer, "vector_storage": vector_storage}
     with st.spinner("데이터 임베딩 중..."):
-        # Train 데이터 (메타데이터와 함께)
-        train_embeddings = embedding_pipeline.generate_embeddings(train_df, text_col)
-        train_class_labels = train_df[class_col[0]].squeeze().tolist()
-        load_and_save_data(train_embeddings, collection_name, "train", train_class_labels, metadata=metadata)
-        
-        # Validation 데이터
-        valid_embeddings = embedding_pipeline.generate_embeddings(valid_df, text_col)
-        valid_class_labels = valid_df[class_col[0]].squeeze().tolist()
-        load_and_save_data(valid_embeddings, collection_name, "valid", valid_class_labels)
-        
-        # Test 데이터
-        test_embeddings = embedding_pipeline.generate_embeddings(test_df, text_col)
-        test_class_labels = test_df[class_col[0]].squeeze().tolist()
-        load_and_save_data(test_embeddings, collection_name, "test", test_class_labels)
+        try:
+            # 공유 레지스트리에서 모델 참조 획득 (finally에서 반드시 해제)
+            embedding_pipeline.load_model()
+
+            # 공통 max_len 결정 (auto: split별 샘플 토큰 길이 90 percentile 중 최댓값 기준)
+            max_lens = select_max_lens(embedding_pipeline, {"train": train_df, "valid": valid_df, "test": test_df},
+                                       text_col, max_len_option)
+
+            # 쓰기 시점 차원 축소: train 샘플로 PCA projection 학습 (캐시로 이후 재임베딩 비용 없음)
+            projection = None
+            if projection_dim != "None":
+                sample_df = train_df.sample(n=min(len(train_df), 5000), random_state=42)
+                sample_embeddings = embedding_pipeline.generate_embeddings(sample_df, text_col, max_len=max_lens["train"],
+                                                                           **embed_kwargs)
+                projection = fit_projection(sample_embeddings, int(projection_dim))
+                st.write(f"🔻 Projection {sample_embeddings.shape[1]} → {projection.n_components_} "
+                         f"(explained variance: {projection.explained_variance_ratio_.sum():.1%})")
+            embed_kwargs["projection"] = projection
+            st.session_state['embedding_config'] = {
+                "pooling": pooling,
+                "projection_dim": projection.n_components_ if projection is not None else None,
+            }
+
+            # 중단된 삽입을 이어서 진행하기 위한 split별 checkpoint (설정이 바뀌면 처음부터)
+            ingest_kwargs["checkpoint"] = IngestCheckpoint(collection_name)
+            ingest_kwargs["run_config"] = {
+                "model": embedding_pipeline.model_name,
+                "backend": embedding_pipeline.backend,
+                **st.session_state['embedding_config'],
+            }
+            if projection is not None:
+                # PCA 기저는 train 샘플로 학습되므로 train이 바뀌면 valid/test도 새 기저로 다시 삽입
+                ingest_kwargs["run_config"]["projection_basis"] = content_digest(train_df[text_col])
+
+            # 임베딩은 split 순서대로, 삽입은 이전 split의 쓰기가 끝나기를 기다리지 않고 계속 진행
+            finishes = []
+            # Train 데이터 (메타데이터와 함께)
+            train_class_labels = train_df[class_col[0]].squeeze().tolist()
+            finishes.append(stream_embed_and_save_data(embedding_pipeline, train_df, text_col, collection_name, "train",
+                                                       train_class_labels, metadata=metadata, max_len=max_lens["train"],
+                                                       **ingest_kwargs, **embed_kwargs))
+            
+            # Validation 데이터
+            valid_class_labels = valid_df[class_col[0]].squeeze().tolist()
+            finishes.append(stream_embed_and_save_data(embedding_pipeline, valid_df, text_col, collection_name, "valid",
+                                                       valid_class_labels, max_len=max_lens["valid"],
+                                                       **ingest_kwargs, **embed_kwargs))
+            
+            # Test 데이터
+            test_class_labels = test_df[class_col[0]].squeeze().tolist()
+            finishes.append(stream_embed_and_save_data(embedding_pipeline, test_df, text_col, collection_name, "test",
+                                                       test_class_labels, max_len=max_lens["test"],
+                                                       **ingest_kwargs, **embed_kwargs))
+
+            # 남은 삽입 완료 대기
+            for finish in finishes:
+                finish()
+        finally:
+            writer.close()
+            embedding_pipeline.shutdown_shards()
+            embedding_pipeline.release_model()
     
-    # 결과 확인
-    collection = Collection(name=collection_name)
-    collection.load()
+    # 세 split 전체 삽입 처리량 표시
+    render_write_stats(writer.stats())
     
-    # 각 set_type별 레코드 수 확인
-    for set_type in ['train', 'valid', 'test', 'metadata']:
-        results = collection.query(expr=f"set_type == '{set_type}'", output_fields=["set_type"], limit=10000)
-        #st.write(f"🔍 {set_type.capitalize()} 레코드: {len(results)}개")
+    # 임베딩 캐시 적중률 표시 (이번 실행 기준)
+    render_cache_stats(embedding_cache, cache_stats_before)
+    
+    # 모든 split 삽입 후 인덱스를 한 번만 생성 (삽입 중 증분 인덱싱 방지)
+    collection = Collection(name=collection_name)
+    with st.spinner("벡터 인덱스 생성 중..."):
+        index_params = build_vector_index(collection, metric_type=metric_type, index_type=index_type,
+                                          latency_sensitive=latency_sensitive)
+
+    # split manifest 기록: 드리프트 페이지가 탐색 쿼리 없이 split 구성/크기를 확인
+    # 모든 split이 완료(checkpoint offset == 행 수)된 뒤이므로 입력 데이터 행 수가 곧 저장된 행 수 (컬렉션 count 조회 없음)
+    split_dfs = {"train": train_df, "valid": valid_df, "test": test_df}
+    split_counts = {split: len(df) for split, df in split_dfs.items()}
+    checksums = {}
+    if uses_row_keys(collection):
+        checksums = {split: row_key_checksum(make_row_keys(df[text_col], split)) for split, df in split_dfs.items()}
+    class_counts = {split: {str(label): int(count) for label, count in df[class_col[0]].astype(str).value_counts().items()}
+                    for split, df in split_dfs.items()}
+    manifest = build_split_manifest(
+        split_counts, get_vector_dim(collection),
+        run_config={**ingest_kwargs["run_config"], "vector_storage": vector_storage, "max_lens": max_lens},
+        checksums=checksums, index_params=index_params, class_counts=class_counts,
+    )
+    write_split_manifest(collection_name, manifest)
+    st.session_state['split_manifest'] = manifest
+    st.write(f"🗂️ Vector index: `{index_params['index_type']}` ({index_params['metric_type']}, "
+             f"params: {index_params['params']}, rows: {sum(split_counts.values()):,})")
     
     st.success("✅ 모든 데이터셋이 Vector Database에 성공적으로 저장되었습니다.")
     
     # 전체 데이터 타입 요약
-    results = collection.query(
-        expr="set_type in ['train', 'valid', 'test', 'metadata']", 
-        output_fields=["set_type"], 
-        limit=10000
-    )
-    set_types = [res["set_type"] for res in results]
-    unique_types = set(set_types)
-    st.write("📊 컬렉션에 저장된 데이터 타입:", unique_types)
\ No newline at end of file
+    unique_types = {set_type for set_type, count in split_counts.items() if count > 0}
+    st.write("📊 컬렉션에 저장된 데이터 타입:", unique_types)
@@ -0,0 +1,135 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+import numpy as np
+
+# 로드한 split 배열(.npy) 스냅샷 저장 위치 및 최대 크기 (환경변수로 변경 가능)
+EMBEDDING_SNAPSHOT_DIR = os.path.join("db", "embedding_snapshots")
+EMBEDDING_SNAPSHOT_MAX_BYTES = int(os.environ.get("EMBEDDING_SNAPSHOT_MAX_BYTES", 8 * 1024 ** 3))  # 8GB
+SNAPSHOT_ARRAYS = ["ids", "vectors", "labels"]
+
+def snapshot_version(manifest=None, timestamp=None):
+    """컬렉션 내용이 바뀌면 달라지는 스냅샷 버전 (manifest 갱신 시각 + split 체크섬, 없으면 메타데이터 timestamp)"""
+    if manifest:
+        splits = {split: [info.get("rows"), info.get("checksum")] for split, info in manifest["splits"].items()}
+        digest = hashlib.sha256(json.dumps(splits, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        return f"{manifest['updated_at']}-{digest}"
+    if timestamp:
+        return str(timestamp)
+    # 버전을 알 수 없으면 오래된 스냅샷을 잘못 재사용하지 않도록 캐시하지 않음
+    return None
+
+## --------------- Snapshot Cache --------------- ##
+class EmbeddingSnapshotCache:
+    """(컬렉션, 버전, split) 단위로 로드한 임베딩 배열을 .npy 파일로 저장하고 memory-map으로 다시 여는 캐시
+
+    같은 버전이면 Milvus 조회 없이 읽기 전용 memmap을 그대로 반환 (복사 없음)
+    새 버전을 저장하면 같은 컬렉션의 이전 버전은 삭제, 용량 초과 시 가장 오래 사용되지 않은(LRU) 스냅샷부터 제거
+    """
+    def __init__(self, cache_dir=EMBEDDING_SNAPSHOT_DIR, max_bytes=EMBEDDING_SNAPSHOT_MAX_BYTES):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, collection_name, version, split=None):
+        path = os.path.join(self.cache_dir, collection_name, version)
+        return os.path.join(path, split) if split else path
+
+    @staticmethod
+    def _size(path):
+        return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+    def get(self, collection_name, version, split):
+        """캐시된 split 배열(읽기 전용 memmap) 반환, 없으면 None"""
+        path = self._path(collection_name, version, split)
+        with self.lock:
+            try:
+                with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in SNAPSHOT_ARRAYS}
+            except (OSError, ValueError):
+                self.misses += 1
+                return None
+            # 마지막 사용 시각 갱신 (LRU 기준)
+            os.utime(path)
+            self.hits += 1
+        arrays["classes"] = meta["classes"]
+        arrays["population"] = meta["rows"]
+        arrays["sampled"] = False
+        return arrays
+
+    def put(self, collection_name, version, split, arrays):
+        """split 배열을 스냅샷으로 저장한 뒤 memmap으로 다시 열어 반환 (용량보다 크면 저장하지 않고 그대로 반환)"""
+        size = sum(arrays[name].nbytes for name in SNAPSHOT_ARRAYS)
+        if size > self.max_bytes:
+            return arrays
+
+        path = self._path(collection_name, version, split)
+        with self.lock:
+            self._drop_stale(collection_name, version)
+            self._evict(self.max_bytes - size)
+
+            # 중간에 중단되어도 불완전한 스냅샷이 남지 않도록 임시 디렉터리에 쓴 뒤 교체
+            tmp_path = f"{path}.tmp"
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            os.makedirs(tmp_path)
+            for name in SNAPSHOT_ARRAYS:
+                np.save(os.path.join(tmp_path, f"{name}.npy"), arrays[name])
+            with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump({"classes": list(arrays["classes"]), "rows": int(len(arrays["ids"])),
+                           "created_at": int(time.time())}, f)
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(tmp_path, path)
+
+        cached = self.get(collection_name, version, split)
+        return cached if cached is not None else arrays
+
+    def _drop_stale(self, collection_name, version):
+        collection_dir = os.path.join(self.cache_dir, collection_name)
+        if not os.path.isdir(collection_dir):
+            return
+        for name in os.listdir(collection_dir):
+            if name != version:
+                shutil.rmtree(os.path.join(collection_dir, name), ignore_errors=True)
+
+    def _snapshots(self):
+        """(마지막 사용 시각, 경로, 크기) 목록"""
+        snapshots = []
+        for collection_name in os.listdir(self.cache_dir):
+            collection_dir = os.path.join(self.cache_dir, collection_name)
+            for version in os.listdir(collection_dir) if os.path.isdir(collection_dir) else []:
+                version_dir = os.path.join(collection_dir, version)
+                for split in os.listdir(version_dir) if os.path.isdir(version_dir) else []:
+                    path = os.path.join(version_dir, split)
+                    if os.path.isdir(path) and not split.endswith(".tmp"):
+                        snapshots.append((os.path.getmtime(path), path, self._size(path)))
+        return sorted(snapshots)
+
+    def _evict(self, budget):
+        snapshots = self._snapshots()
+        total = sum(size for _, _, size in snapshots)
+        for _, path, size in snapshots:
+            if total <= budget:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            self.evictions += 1
+
+    def stats(self):
+        with self.lock:
+            snapshots = self._snapshots()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(snapshots),
+            "size_mb": sum(size for _, _, size in snapshots) / 1024 ** 2,
+            "capacity_mb": self.max_bytes / 1024 ** 2,
+        }
@@ -0,0 +1,60 @@
+import json
+import time
+import numpy as np
+from .metadata_store import METADATA_FIELDS, read_metadata, write_metadata, update_metadata
+
+# 삽입 시점에 기록하는 split manifest: 로드 전 set_type 탐색/count 쿼리 없이 split 구성을 확인
+MANIFEST_VERSION = 1
+# split_manifest VARCHAR 필드 최대 길이 (UTF-8 바이트)
+MANIFEST_MAX_BYTES = next(max_length for name, _, max_length in METADATA_FIELDS if name == "split_manifest")
+
+def row_key_checksum(ids):
+    """행 순서와 무관한 row key 체크섬 (uint64 합, 로드한 id 배열로 같은 값을 다시 계산해 비교)"""
+    ids = np.ascontiguousarray(ids, dtype=np.int64)
+    return format(int(ids.view(np.uint64).sum(dtype=np.uint64)), "016x")
+
+def build_split_manifest(split_counts, dim, run_config=None, checksums=None, index_params=None, partitioned=True,
+                         class_counts=None):
+    checksums = checksums or {}
+    class_counts = class_counts or {}
+    return {
+        "version": MANIFEST_VERSION,
+        # classes: split별 class 행 수 (층화 샘플링 로드에서 class별 표본 크기 계산에 사용)
+        "splits": {split: {"rows": int(rows), "checksum": checksums.get(split), "classes": class_counts.get(split)}
+                   for split, rows in split_counts.items()},
+        "dim": int(dim),
+        "partitioned": partitioned,
+        "run_config": run_config or {},
+        "index": index_params,
+        "updated_at": int(time.time()),
+    }
+
+def serialize_split_manifest(manifest, max_bytes=MANIFEST_MAX_BYTES):
+    """manifest JSON 문자열 (class 수가 많아 필드 길이를 넘으면 class별 행 수를 빼고 기록 → 균등 샘플링)"""
+    manifest_json = json.dumps(manifest, default=str, ensure_ascii=False)
+    if len(manifest_json.encode("utf-8")) <= max_bytes:
+        return manifest_json
+    manifest = {**manifest, "splits": {split: {**info, "classes": None} for split, info in manifest["splits"].items()}}
+    manifest_json = json.dumps(manifest, default=str, ensure_ascii=False)
+    if len(manifest_json.encode("utf-8")) > max_bytes:
+        raise ValueError(f"Split manifest is {len(manifest_json.encode('utf-8')):,} bytes, "
+                         f"larger than the {max_bytes:,}-byte metadata field.")
+    return manifest_json
+
+def write_split_manifest(collection_name, manifest):
+    manifest_json = serialize_split_manifest(manifest)
+    if update_metadata(collection_name, split_manifest=manifest_json) is None:
+        write_metadata(collection_name, {"split_manifest": manifest_json})
+
+def read_split_manifest(collection_name, metadata=None):
+    """manifest dict 반환 (없거나 버전이 다르면 None, 이 경우 기존 탐색 경로 사용)"""
+    metadata = metadata if metadata is not None else read_metadata(collection_name)
+    if not metadata or not metadata.get("split_manifest"):
+        return None
+    try:
+        manifest = json.loads(metadata["split_manifest"])
+    except (TypeError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
@@ -1,3 +1,8 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import deque
+from types import SimpleNamespace
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -5,8 +10,18 @@ from transformers import AutoTokenizer, AutoModel
 from torch.utils.data import DataLoader, Dataset
 import torch
 from sklearn.metrics.pairwise import euclidean_distances, cosine_similarity
+from sklearn.decomposition import PCA
 import matplotlib.pyplot as plt
 import seaborn as sns
+try:
+    from .embedding_cache import EmbeddingCache
+    from .model_registry import ModelRegistry
+    from .embedding_server import decode_array
+except ImportError:
+    # Fallback for standalone execution
+    from embedding_cache import EmbeddingCache
+    from model_registry import ModelRegistry
+    from embedding_server import decode_array
 
 ## --------------- Load Data --------------- ##
 
@@ -84,27 +99,177 @@ def get_data_from_session():
     return train_df, valid_df, test_df
 
 ## --------------- Embedding --------------- ##
+class TokenizeCollator:
+    """prefetch thread 또는 DataLoader worker에서 배치를 토큰화하여 패딩된 텐서로 반환 (모델 추론과 병렬 수행)"""
+    def __init__(self, tokenizer, max_len):
+        self.tokenizer = tokenizer
+        self.max_len = max_len
+
+    def __call__(self, batch):
+        if batch and isinstance(batch[0], dict):
+            # 이미 토큰화된 행(token_budget 배치 구성 시 계산)은 다시 토큰화하지 않고 패딩만 수행
+            return self.tokenizer.pad(list(batch), return_tensors="pt")
+        return self.tokenizer(list(batch), return_tensors="pt", padding=True, truncation=True, max_length=self.max_len)
+
+## CPU 추론용 backend
+# torch : fp32 PyTorch (기본값)
+# int8  : Linear 레이어 dynamic int8 양자화 (CPU 전용)
+# onnx  : ONNX Runtime 그래프 최적화 (CPU 전용, onnxruntime 필요)
+EMBEDDING_BACKENDS = ["torch", "int8", "onnx"]
+ONNX_EXPORT_DIR = os.path.join("models", "onnx")
+
+class LastHiddenStateModule(torch.nn.Module):
+    """ONNX export용: last_hidden_state 텐서만 반환"""
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
+
+class OnnxEncoder:
+    """ONNX Runtime 세션을 transformers 모델과 같은 호출 방식으로 감싼 인코더"""
+    def __init__(self, onnx_path, num_threads=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.onnx_path = onnx_path
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [node.name for node in self.session.get_inputs()]
+
+    def eval(self):
+        return self
+
+    def __call__(self, **inputs):
+        feeds = {name: inputs[name].cpu().numpy() for name in self.input_names}
+        last_hidden_state = self.session.run(["last_hidden_state"], feeds)[0]
+        return SimpleNamespace(last_hidden_state=torch.from_numpy(last_hidden_state))
+
+def export_onnx(model_name, export_dir=ONNX_EXPORT_DIR):
+    """fp32 모델을 ONNX로 export (이미 존재하면 재사용)"""
+    onnx_path = os.path.join(export_dir, f"{model_name.replace('/', '_')}.onnx")
+    if os.path.exists(onnx_path):
+        return onnx_path
+
+    os.makedirs(export_dir, exist_ok=True)
+    model = AutoModel.from_pretrained(model_name).eval()
+    dummy = torch.ones((1, 8), dtype=torch.long)
+    torch.onnx.export(
+        LastHiddenStateModule(model),
+        (dummy, dummy),
+        onnx_path,
+        input_names=["input_ids", "attention_mask"],
+        output_names=["last_hidden_state"],
+        dynamic_axes={
+            "input_ids": {0: "batch", 1: "sequence"},
+            "attention_mask": {0: "batch", 1: "sequence"},
+            "last_hidden_state": {0: "batch", 1: "sequence"},
+        },
+        opset_version=17,
+    )
+    return onnx_path
+
+def load_encoder(model_name, device, backend="torch"):
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend} (choose from {EMBEDDING_BACKENDS})")
+    if backend == "onnx":
+        return OnnxEncoder(export_onnx(model_name))
+
+    model = AutoModel.from_pretrained(model_name).eval()
+    if backend == "int8":
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model.to(device)
+
+## 문장 임베딩 pooling 방식
+# cls  : [CLS] 토큰의 임베딩 (기본값)
+# mean : attention mask를 고려한 토큰 평균
+# max  : attention mask를 고려한 토큰별 최댓값
+POOLING_METHODS = ["cls", "mean", "max"]
+
+def pool_hidden_states(last_hidden_state, attention_mask, pooling="cls"):
+    if pooling == "cls":
+        return last_hidden_state[:, 0, :]
+    mask = attention_mask.unsqueeze(-1).to(last_hidden_state.dtype)
+    if pooling == "mean":
+        return (last_hidden_state * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+    if pooling == "max":
+        return last_hidden_state.masked_fill(mask == 0, float("-inf")).max(dim=1).values
+    raise ValueError(f"Unknown pooling method: {pooling}")
+
+def fit_projection(embeddings, n_components):
+    """쓰기 시점 차원 축소용 PCA projection 학습 (train 샘플 기준)"""
+    n_components = min(n_components, embeddings.shape[0], embeddings.shape[1])
+    # 재실행(이어서 삽입) 시에도 같은 projection이 나오도록 random_state 고정
+    return PCA(n_components=n_components, random_state=42).fit(embeddings)
+
+def apply_projection(projection, embeddings):
+    return projection.transform(embeddings).astype(np.float32)
+
+# DataLoader worker 수 기본값: Streamlit 서버 프로세스 안에서 worker를 fork하지 않음 (benchmark에서만 지정)
+# worker가 0이면 background thread가 다음 배치를 미리 토큰화 (Rust tokenizer는 GIL을 해제하므로 모델 추론과 겹침)
+EMBEDDING_LOADER_WORKERS = 0
+EMBEDDING_PREFETCH_BATCHES = 4
+
+## 배치 구성 방식
+# token_budget : 토큰 길이 순 정렬 후 (배치 크기 x 최장 길이) 예산 단위로 배치 (패딩 낭비 감소, 기본값)
+# fixed        : 행 순서대로 batch_size개씩
+EMBEDDING_BATCHING_MODES = ["token_budget", "fixed"]
+EMBEDDING_MAX_TOKENS = 4096
+
+class EmbeddingError(RuntimeError):
+    """배치 임베딩 실패 (0 벡터를 유효한 임베딩처럼 반환하지 않고 호출자가 중단하도록 전달)"""
+
 class EmbeddingPipeline:
-    def __init__(self, model_name="klue/roberta-base", device=None):
-        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+    def __init__(self, model_name="klue/roberta-base", device=None, use_fast=True, backend="torch", pooling="cls",
+                 server_url=None):
+        if pooling not in POOLING_METHODS:
+            raise ValueError(f"Unknown pooling method: {pooling} (choose from {POOLING_METHODS})")
+        # int8 / onnx backend는 CPU에서만 동작
+        self.device = "cpu" if backend != "torch" else (device or ("cuda" if torch.cuda.is_available() else "cpu"))
         self.model_name = model_name
+        self.use_fast = use_fast
+        self.backend = backend
+        self.pooling = pooling
+        # client 모드: 로컬 임베딩 서버(app/database/embedding_server.py)에 추론을 위임
+        self.server_url = server_url.rstrip("/") if server_url else None
         self.tokenizer = None
         self.model = None
+        self._shard_executor = None
+        self._shard_executor_key = None
+
+    @property
+    def registry_key(self):
+        return (self.model_name, self.device, self.backend)
 
     def load_model(self):
-        # 세션 상태를 사용하여 모델 로드 과정을 최적화
-        if 'tokenizer' not in st.session_state or 'model' not in st.session_state:
-            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name, use_fast=False)
-            self.model = AutoModel.from_pretrained(self.model_name).to(self.device)
-            st.session_state['tokenizer'] = self.tokenizer
-            st.session_state['model'] = self.model
-        else:
-            self.tokenizer = st.session_state['tokenizer']
-            self.model = st.session_state['model']
+        # 프로세스 전체에서 공유하는 레지스트리 사용 (세션마다 모델을 복사하지 않음)
+        if self.model is not None:
+            return
+        if self.server_url:
+            # 서버가 모델을 보유하므로 max_len 추정용 tokenizer만 로드
+            self._check_server()
+            if self.tokenizer is None:
+                self.tokenizer = AutoTokenizer.from_pretrained(self.model_name, use_fast=self.use_fast)
+            return
+        self.tokenizer, self.model = get_model_registry().acquire(
+            self.registry_key,
+            lambda: (AutoTokenizer.from_pretrained(self.model_name, use_fast=self.use_fast),
+                     load_encoder(self.model_name, self.device, self.backend))
+        )
+
+    def release_model(self):
+        """레지스트리 참조 해제 (LRU eviction 대상이 될 수 있음)"""
+        if self.model is not None:
+            get_model_registry().release(self.registry_key)
+            self.tokenizer = None
+            self.model = None
 
     class CustomDataset(Dataset):
         def __init__(self, dataframe, text_col):
-            self.texts = dataframe[text_col]
+            self.texts = dataframe[text_col].astype(str)
 
         def __len__(self):
             return len(self.texts)
@@ -112,31 +277,266 @@ class EmbeddingPipeline:
         def __getitem__(self, idx):
             return self.texts.iloc[idx]
 
-    def calculate_max_len(self, dataframe, text_col, thresholds=[64, 128, 256, 512]):
-        token_lengths = [len(self.tokenizer.encode(text)) for text in dataframe[text_col]]
-        suggested_max_len = np.percentile(token_lengths, 90)  # 90th percentile
-        max_len = min(thresholds, key=lambda x: abs(x - suggested_max_len))
-        return max_len
+    class EncodedDataset(Dataset):
+        """토큰화 결과(열 단위 list)를 행 단위 dict로 반환"""
+        def __init__(self, encodings):
+            self.encodings = encodings
+
+        def __len__(self):
+            return len(self.encodings["input_ids"])
+
+        def __getitem__(self, idx):
+            return {key: values[idx] for key, values in self.encodings.items()}
+
+    def estimate_token_lengths(self, dataframe, text_col, sample_size=2000, seed=42):
+        """최대 sample_size개 행을 샘플링하여 토큰 길이 추정 (fast tokenizer 배치 호출)"""
+        texts = dataframe[text_col].astype(str)
+        if len(texts) > sample_size:
+            texts = texts.sample(n=sample_size, random_state=seed)
+        return np.array([len(ids) for ids in self.tokenizer(texts.tolist(), truncation=False)["input_ids"]])
+
+    def calculate_max_len(self, dataframe, text_col, thresholds=[64, 128, 256, 512], percentile=90, sample_size=2000):
+        token_lengths = self.estimate_token_lengths(dataframe, text_col, sample_size=sample_size)
+        suggested_max_len = np.percentile(token_lengths, percentile)
+        # percentile 길이를 모두 담을 수 있는 가장 작은 threshold 선택
+        covering = [x for x in sorted(thresholds) if x >= suggested_max_len]
+        max_len = covering[0] if covering else max(thresholds)
+        return max_len, token_lengths
+
+    @staticmethod
+    def max_len_tradeoff(token_lengths, thresholds=[64, 128, 256, 512], baseline=128):
+        """max_len 후보별 잘리는 행 비율과 예상 연산량(baseline 대비) 비교표"""
+        token_lengths = np.asarray(token_lengths)
+        baseline_tokens = np.minimum(token_lengths, baseline).mean()
+        rows = []
+        for max_len in thresholds:
+            avg_tokens = np.minimum(token_lengths, max_len).mean()
+            rows.append({
+                "max_len": max_len,
+                "truncated_rows(%)": round(float((token_lengths > max_len).mean() * 100), 2),
+                "avg_tokens_per_row": round(float(avg_tokens), 1),
+                "relative_cost": round(float(avg_tokens / baseline_tokens), 2) if baseline_tokens else None,
+            })
+        return pd.DataFrame(rows)
+
+    def make_token_budget_batches(self, texts, max_len=128, max_tokens=EMBEDDING_MAX_TOKENS):
+        """토큰 길이 순으로 정렬한 뒤 (배치 크기 x 최장 길이)가 max_tokens를 넘지 않도록 배치 인덱스 구성
+
+        길이 계산에 쓴 토큰화 결과도 함께 반환하여 collate에서 다시 토큰화하지 않음
+        """
+        encodings = self.tokenizer(list(texts), truncation=True, max_length=max_len)
+        token_lengths = [len(ids) for ids in encodings["input_ids"]]
+        order = np.argsort(token_lengths, kind="stable")
+
+        batches, current = [], []
+        for idx in order:
+            # 오름차순 정렬이므로 현재 토큰 길이가 배치 내 최장 길이
+            padded_len = token_lengths[idx]
+            if current and (len(current) + 1) * padded_len > max_tokens:
+                batches.append(current)
+                current = []
+            current.append(int(idx))
+        if current:
+            batches.append(current)
+        return batches, encodings
+
+    def build_data_loader(self, dataset, batches, max_len, num_workers=EMBEDDING_LOADER_WORKERS):
+        """토큰화를 collate_fn으로 분리하여 worker에서 다음 배치를 미리 준비"""
+        loader_kwargs = {}
+        if num_workers > 0:
+            # fork된 worker 안에서 Rust tokenizer 내부 스레드 충돌 방지
+            os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+            loader_kwargs = {"prefetch_factor": 4}
+        return DataLoader(
+            dataset,
+            batch_sampler=batches,
+            collate_fn=TokenizeCollator(self.tokenizer, max_len),
+            num_workers=num_workers,
+            pin_memory=(self.device == "cuda"),
+            **loader_kwargs
+        )
+
+    def iter_prefetched_batches(self, dataset, batches, max_len, depth=EMBEDDING_PREFETCH_BATCHES):
+        """프로세스 worker 없이 thread 하나로 최대 depth개 배치를 미리 토큰화하여 순서대로 반환"""
+        collate = TokenizeCollator(self.tokenizer, max_len)
+        pin_memory = self.device == "cuda"
+
+        def prepare(batch_idx):
+            inputs = collate([dataset[i] for i in batch_idx])
+            return {k: v.pin_memory() for k, v in inputs.items()} if pin_memory else inputs
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = deque(executor.submit(prepare, batch_idx) for batch_idx in batches[:depth])
+            for batch_idx in batches[depth:]:
+                # 현재 배치를 넘겨주기 전에 다음 배치 토큰화를 예약
+                pending.append(executor.submit(prepare, batch_idx))
+                yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def generate_embeddings(self, dataframe, text_col, max_len=128, batch_size=16,
+                            batching="fixed", max_tokens=EMBEDDING_MAX_TOKENS, num_workers=EMBEDDING_LOADER_WORKERS, cache=None,
+                            num_shards=1):
+        # 캐시가 주어지면 캐시에 없는 행만 모델에 입력
+        if cache is not None:
+            return self._generate_embeddings_cached(dataframe, text_col, cache, max_len=max_len, batch_size=batch_size,
+                                                    batching=batching, max_tokens=max_tokens, num_workers=num_workers,
+                                                    num_shards=num_shards)
+
+        if self.server_url:
+            return self._generate_embeddings_remote(dataframe, text_col, max_len)
+
+        # CPU에서는 연속된 shard로 나누어 프로세스별로 병렬 임베딩
+        if num_shards > 1 and self.device == "cpu":
+            return self.generate_embeddings_sharded(dataframe, text_col, num_shards, max_len=max_len, batch_size=batch_size,
+                                                    batching=batching, max_tokens=max_tokens)
 
-    def generate_embeddings(self, dataframe, text_col, max_len=128, batch_size=16):
         # 데이터셋 준비
         dataset = self.CustomDataset(dataframe, text_col)
-        data_loader = DataLoader(dataset, batch_size=batch_size, shuffle=False)
+        if batching == "token_budget":
+            # 길이 순 정렬 후 토큰 예산 단위로 배치 구성 (패딩 낭비 감소)
+            batches, encodings = self.make_token_budget_batches(dataset.texts.tolist(), max_len=max_len,
+                                                                max_tokens=max_tokens)
+            dataset = self.EncodedDataset(encodings)
+        else:
+            batches = [list(range(i, min(i + batch_size, len(dataset)))) for i in range(0, len(dataset), batch_size)]
+        if num_workers > 0:
+            batch_iter = iter(self.build_data_loader(dataset, batches, max_len, num_workers=num_workers))
+        else:
+            batch_iter = self.iter_prefetched_batches(dataset, batches, max_len)
 
-        # 임베딩 생성
-        embeddings = []
+        # 임베딩 생성 (결과는 원래 행 순서대로 채워 넣음)
+        embeddings = None
         self.model.eval()
         with torch.no_grad():
-            for batch in data_loader:
+            for batch_idx in batches:
                 try:
-                    inputs = self.tokenizer(list(batch), return_tensors="pt", padding=True, truncation=True, max_length=max_len).to(self.device)
+                    # 토큰화(collate_fn) 오류도 batch iterator에서 발생하므로 같은 try 안에서 처리
+                    inputs = next(batch_iter)
+                    inputs = {k: v.to(self.device, non_blocking=True) for k, v in inputs.items()}
                     outputs = self.model(**inputs)
-                    cls_embeddings = outputs.last_hidden_state[:, 0, :]  # [CLS] 토큰의 임베딩
-                    embeddings.append(cls_embeddings.cpu())
+                    pooled = pool_hidden_states(outputs.last_hidden_state, inputs["attention_mask"], self.pooling)
                 except Exception as e:
-                    st.error(f"Error in generating embeddings for batch: {e}")
-        
-        return torch.cat(embeddings).numpy()
+                    raise EmbeddingError(f"Failed to embed rows {batch_idx[0]}..{batch_idx[-1]} "
+                                         f"({len(batch_idx)} rows): {e}") from e
+                if embeddings is None:
+                    embeddings = np.zeros((len(dataset), pooled.shape[1]), dtype=np.float32)
+                embeddings[batch_idx] = pooled.float().cpu().numpy()
+
+        return embeddings
+
+    def _check_server(self):
+        """서버 모델 설정이 client 설정과 같은지 확인 (캐시 namespace 일관성)"""
+        info = requests.get(f"{self.server_url}/health", timeout=10).json()
+        # backend도 캐시 namespace에 포함되므로 서버 설정으로 바꾸지 않고 불일치 시 중단
+        if (info["model_name"] != self.model_name or info["pooling"] != self.pooling
+                or info["backend"] != self.backend):
+            raise ValueError(f"Embedding server serves {info['model_name']} ({info['pooling']}, {info['backend']}), "
+                             f"but {self.model_name} ({self.pooling}, {self.backend}) was requested.")
+        return info
+
+    def _generate_embeddings_remote(self, dataframe, text_col, max_len, request_rows=128, concurrency=4):
+        """행을 request_rows 단위로 나누어 동시에 요청 (서버에서 다른 요청과 함께 batching)"""
+        texts = dataframe[text_col].astype(str).tolist()
+
+        def post(chunk):
+            response = requests.post(f"{self.server_url}/embed", timeout=600,
+                                     json={"texts": chunk, "max_len": max_len, "model_name": self.model_name})
+            if response.status_code != 200:
+                raise RuntimeError(f"Embedding server error: {response.json().get('error')}")
+            return decode_array(response.json())
+
+        chunks = [texts[i:i + request_rows] for i in range(0, len(texts), request_rows)]
+        if not chunks:
+            return None
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return np.concatenate(list(executor.map(post, chunks)))
+
+    def _generate_embeddings_cached(self, dataframe, text_col, cache, max_len, **kwargs):
+        texts = dataframe[text_col].astype(str).tolist()
+        model_id = self.model_name if self.backend == "torch" else f"{self.model_name}@{self.backend}"
+        namespace = cache.namespace(model_id, max_len, self.pooling)
+        embeddings, hit_mask = cache.lookup(texts, namespace)
+
+        miss_idx = np.flatnonzero(~hit_mask)
+        if len(miss_idx) > 0:
+            # 임베딩 실패 시 EmbeddingError가 전달됨 (miss 행을 0 벡터로 반환하지 않음)
+            miss_embeddings = self.generate_embeddings(dataframe.iloc[miss_idx], text_col, max_len=max_len, **kwargs)
+            if miss_embeddings is None or len(miss_embeddings) != len(miss_idx):
+                raise EmbeddingError(f"Expected {len(miss_idx)} embeddings for cache misses, "
+                                     f"got {0 if miss_embeddings is None else len(miss_embeddings)}.")
+            embeddings[miss_idx] = miss_embeddings
+            cache.store([texts[i] for i in miss_idx], namespace, miss_embeddings)
+
+        return embeddings
+
+    def get_shard_executor(self, num_workers, threads_per_shard):
+        """shard worker 프로세스 풀 (같은 설정이면 재사용하여 모델을 다시 로드하지 않음)"""
+        key = (num_workers, threads_per_shard)
+        if self._shard_executor is None or self._shard_executor_key != key:
+            self.shutdown_shards()
+            # fork 시 OpenMP 스레드 교착을 피하기 위해 spawn 사용
+            self._shard_executor = ProcessPoolExecutor(
+                max_workers=num_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_shard_worker,
+                initargs=(self.model_name, self.backend, self.use_fast, self.pooling, threads_per_shard),
+            )
+            self._shard_executor_key = key
+        return self._shard_executor
+
+    def shutdown_shards(self):
+        if self._shard_executor is not None:
+            self._shard_executor.shutdown()
+            self._shard_executor = None
+            self._shard_executor_key = None
+
+    def generate_embeddings_sharded(self, dataframe, text_col, num_shards, threads_per_shard=None, **kwargs):
+        """데이터프레임을 num_shards개의 연속 구간으로 나누어 worker 프로세스에서 임베딩 후 행 순서대로 결합"""
+        texts = dataframe[text_col].astype(str).tolist()
+        threads_per_shard = threads_per_shard or max(1, (os.cpu_count() or 1) // num_shards)
+        executor = self.get_shard_executor(num_shards, threads_per_shard)
+
+        bounds = np.linspace(0, len(texts), max(1, min(num_shards, len(texts))) + 1, dtype=int)
+        futures = [
+            executor.submit(_embed_shard, texts[start:end], kwargs)
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+        shards = [future.result() for future in futures]
+
+        # 실패한 shard는 future.result()에서 EmbeddingError로 전달됨 (빈 shard만 None)
+        shards = [shard for shard in shards if shard is not None]
+        if not shards:
+            return None
+        return np.concatenate(shards)
+
+## shard worker 프로세스 (프로세스당 모델 1회 로드)
+_SHARD_PIPELINE = None
+
+def _init_shard_worker(model_name, backend, use_fast, pooling, num_threads):
+    global _SHARD_PIPELINE
+    torch.set_num_threads(num_threads)
+    torch.set_num_interop_threads(1)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+    _SHARD_PIPELINE = EmbeddingPipeline(model_name=model_name, device="cpu", use_fast=use_fast, backend=backend,
+                                        pooling=pooling)
+    _SHARD_PIPELINE.tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=use_fast)
+    _SHARD_PIPELINE.model = load_encoder(model_name, "cpu", backend)
+
+def _embed_shard(texts, kwargs):
+    # worker 안에서는 DataLoader worker를 추가로 띄우지 않음
+    return _SHARD_PIPELINE.generate_embeddings(pd.DataFrame({"text": texts}), "text", num_workers=0, **kwargs)
+
+@st.cache_resource
+def get_model_registry():
+    """프로세스 전체에서 공유하는 모델 레지스트리"""
+    return ModelRegistry()
+
+@st.cache_resource
+def get_embedding_cache(dim=768):
+    """프로세스 전체에서 공유하는 임베딩 캐시"""
+    return EmbeddingCache(dim=dim)
 
 # top keywords 저장
 from collections import Counter
@@ -4,7 +4,10 @@ import pandas as pd
 import streamlit as st
 import matplotlib.pyplot as plt
 import json
-from pymilvus import Collection, utility
+from pymilvus import utility
+from ...database.milvus_connection import ensure_milvus_connection
+from ...database.metadata_store import update_metadata
+from ..utils import format_sample_info
 
 # Detect DataDrift
 from evidently.metrics import EmbeddingsDriftMetric
@@ -21,81 +24,66 @@ HTML_SAVE_PATH = "reports"
 if not os.path.exists(HTML_SAVE_PATH):
     os.makedirs(HTML_SAVE_PATH)
 
+#  --------------------------------------------- Drift Scores ---------------------------------------------
+def get_drift_test_methods():
+    return {
+        "MMD": mmd(threshold=0.015),
+        "Wasserstein Distance": ratio(component_stattest='wasserstein', component_stattest_threshold=0.1, threshold=0.015),
+        "KL Divergence": ratio(component_stattest='kl_div', component_stattest_threshold=0.1, threshold=0.015),
+        "JensenShannon Divergence": ratio(component_stattest='jensenshannon', component_stattest_threshold=0.1, threshold=0.015),
+        "Energy Distance": ratio(component_stattest='ed', component_stattest_threshold=0.1, threshold=0.015),
+    }
+
+def to_embedding_frames(reference_embeddings, current_embeddings):
+    # 스냅샷 memmap 배열을 복사하지 않고 DataFrame으로 감쌈
+    reference_df = pd.DataFrame(reference_embeddings, copy=False,
+                                columns=[f"dim_{i}" for i in range(reference_embeddings.shape[1])])
+    current_df = pd.DataFrame(current_embeddings, copy=False,
+                              columns=[f"dim_{i}" for i in range(current_embeddings.shape[1])])
+    column_mapping = ColumnMapping(
+        embeddings={'all_dimensions': reference_df.columns.tolist()}
+    )
+    return reference_df, current_df, column_mapping
+
+def compute_drift_scores(reference_embeddings, current_embeddings, test_methods=None):
+    """방법별 (drift_score, drift_detected) 계산, 실패한 방법은 예외 객체를 값으로 반환"""
+    reference_df, current_df, column_mapping = to_embedding_frames(reference_embeddings, current_embeddings)
+    scores = {}
+    for name, method in (test_methods or get_drift_test_methods()).items():
+        try:
+            temp_report = Report(metrics=[EmbeddingsDriftMetric('all_dimensions', drift_method=method)])
+            temp_report.run(reference_data=reference_df, current_data=current_df, column_mapping=column_mapping)
+            result = temp_report.as_dict().get("metrics", [])[0].get("result", {})
+            scores[name] = (result.get("drift_score", "N/A"), result.get("drift_detected", "N/A"))
+        except Exception as e:
+            scores[name] = e
+    return scores
+
 #  --------------------------------------------- Update Drift Metadata ---------------------------------------------
 def update_metadata_to_vectordb(dataset_name):
-    """드리프트 관련 메타데이터를 Milvus Collection에 업데이트"""
+    """드리프트 관련 메타데이터를 메타데이터 컬렉션에 업데이트"""
     try:
+        ensure_milvus_connection()
         if not utility.has_collection(dataset_name):
             st.error(f"Collection '{dataset_name}'이 존재하지 않습니다.")
             return None
-            
-        collection = Collection(name=dataset_name)
-        collection.load()
         
-        # 기존 메타데이터 조회
-        metadata_results = collection.query(
-            expr="set_type == 'metadata'",
-            output_fields=["id", "dataset_name", "summary_dict", "data_previews", "class_dist_path",
-                          "doc_len_path", "doc_len_table", "wordcloud_path", "timestamp"],
-            limit=1
+        # 세션에서 드리프트 관련 데이터 가져와 기존 메타데이터에 반영
+        result = update_metadata(
+            dataset_name,
+            dimension=float(st.session_state.get("selected_dimension", 0)),  # selected_dimension 사용
+            embedding_size=st.session_state.get("embedding_overview_text", ""),
+            drift_score_summary=st.session_state.get("drift_score_summary", ""),
+            original_distance_path=st.session_state.get("original_distance_path", ""),
+            PCA_distance_path=st.session_state.get("PCA_distance_path", ""),
+            PCA_visualization_path=st.session_state.get("PCA_visualization_path", ""),
         )
-        
-        if not metadata_results:
+        if result is None:
             st.error("기존 메타데이터를 찾을 수 없습니다.")
             return None
-            
-        existing_metadata = metadata_results[0]
-        metadata_id = existing_metadata["id"]
-        
-        # 기존 메타데이터 삭제
-        delete_expr = f"id in [{metadata_id}]"
-        st.write(f"🔍 Delete expression: {delete_expr}")  # 디버깅용
-        collection.delete(delete_expr)
-        collection.flush()
-        
-        # 세션에서 드리프트 관련 데이터 가져오기
-        embedding_size = st.session_state.get("embedding_overview_text", "")
-        dimension = float(st.session_state.get("selected_dimension", 0))  # selected_dimension 사용
-        drift_score_summary = st.session_state.get("drift_score_summary", "")
-        original_distance_path = st.session_state.get("original_distance_path", "")
-        pca_distance_path = st.session_state.get("PCA_distance_path", "")
-        pca_visualization_path = st.session_state.get("PCA_visualization_path", "")
-        
-        # 새 메타데이터 삽입 (기존 데이터 + 드리프트 데이터)
-        dummy_vector = [0.0] * 768
-        
-        data = [
-            ["metadata"],                                    # set_type
-            ["metadata"],                                    # class
-            [dummy_vector],                                  # vector
-            [existing_metadata["dataset_name"]],            # dataset_name
-            [existing_metadata["summary_dict"]],            # summary_dict
-            [existing_metadata["data_previews"]],           # data_previews
-            [existing_metadata["class_dist_path"]],         # class_dist_path
-            [existing_metadata["doc_len_path"]],            # doc_len_path
-            [existing_metadata["doc_len_table"]],           # doc_len_table
-            [existing_metadata["wordcloud_path"]],          # wordcloud_path
-            [existing_metadata["timestamp"]],               # timestamp
-            # 데이터 드리프트 필드들 업데이트
-            [dimension],                                     # dimension
-            [embedding_size],                                # embedding_size
-            [original_distance_path],                        # original_distance_path
-            [pca_distance_path],                            # PCA_distance_path
-            [pca_visualization_path],                       # PCA_visualization_path
-            [drift_score_summary],                          # drift_score_summary
-        ]
-        
-        fields = ["set_type", "class", "vector", "dataset_name", "summary_dict", 
-                 "data_previews", "class_dist_path", "doc_len_path", "doc_len_table", 
-                 "wordcloud_path", "timestamp", "dimension", "embedding_size", 
-                 "original_distance_path", "PCA_distance_path", "PCA_visualization_path", 
-                 "drift_score_summary"]
-        
-        result = collection.insert(data, fields=fields)
-        collection.flush()
         
         st.success("✅ 데이터 드리프트 메타데이터가 벡터DB에 저장되었습니다.")
-        return result.primary_keys[0]
+        return result
         
     except Exception as e:
         st.error(f"❌ 드리프트 메타데이터 업데이트 실패: {e}")
@@ -107,44 +95,37 @@ def render():
     dataset_name = st.session_state.get('dataset_name')
     # st.title(f"Detect {dataset_name} DataDrift Page")
 
-    if 'train_embeddings' not in st.session_state or 'valid_embeddings' not in st.session_state or 'test_embeddings' not in st.session_state:
+    if 'train_embeddings' not in st.session_state:
         st.error("Embeddings are not available. Please generate embeddings in the 'Embedding Visualization' tab first.")
         return
 
-    train_embeddings = st.session_state['train_embeddings']
-    valid_embeddings = st.session_state['valid_embeddings']
-    test_embeddings = st.session_state['test_embeddings']
-
-    # 데이터 형식 확인 및 변환
-    if not isinstance(train_embeddings, np.ndarray):
-        train_embeddings = np.array(train_embeddings)
-    if not isinstance(valid_embeddings, np.ndarray):
-        valid_embeddings = np.array(valid_embeddings)
-    if not isinstance(test_embeddings, np.ndarray):
-        test_embeddings = np.array(test_embeddings)
+    # 비교 대상(current)은 test, test를 로드하지 않았으면 valid (로드하지 않은 split은 빈 배열)
+    use_pca = 'train_embeddings_pca' in st.session_state and 'selected_dimension' in st.session_state
+    suffix = "_embeddings_pca" if use_pca else "_embeddings"
+    current_split = next((split for split in ["test", "valid"]
+                          if st.session_state.get(f"{split}{suffix}") is not None
+                          and np.asarray(st.session_state[f"{split}{suffix}"]).size > 0), None)
+    if current_split is None:
+        st.error("Load the test (or valid) split to compare with train.")
+        return
 
     # PCA 적용된 임베딩이 있으면 사용 (embedding_visualization에서 생성된 것)
-    if ('train_embeddings_pca' in st.session_state and 
-        'test_embeddings_pca' in st.session_state and
-        'selected_dimension' in st.session_state):
-
-        train_embeddings = st.session_state['train_embeddings_pca']
-        test_embeddings = st.session_state['test_embeddings_pca']
+    train_embeddings = np.asarray(st.session_state[f"train{suffix}"])
+    current_embeddings = np.asarray(st.session_state[f"{current_split}{suffix}"])
+    if use_pca:
         selected_dim = st.session_state['selected_dimension']
         st.info(f"🎯 Using PCA-reduced embeddings from Visualization page (Dimension: {selected_dim})")
     else:
         st.warning("⚠️ Using original embeddings. Please visit Embedding Visualization page first to apply dimension reduction.")
 
     # evidentlyai - 데이터 드리프트 검사
-    st.write("Train(reference)-Test(current) Data Drift Detection")
-    reference_df = pd.DataFrame(train_embeddings, 
-                                columns=[f"dim_{i}" for i in range(train_embeddings.shape[1])])
-    current_df = pd.DataFrame(test_embeddings, 
-                              columns=[f"dim_{i}" for i in range(test_embeddings.shape[1])])
-
-    column_mapping = ColumnMapping(
-        embeddings={'all_dimensions': reference_df.columns.tolist()}
-    )
+    st.write(f"Train(reference)-{current_split.capitalize()}(current) Data Drift Detection")
+    if current_split != "test":
+        st.info("ℹ️ Test split not loaded: using valid as the current data.")
+    sample_info = st.session_state.get('embedding_sample')
+    if sample_info:
+        st.warning(f"🎲 Drift scores are computed on a sample and are approximate: {format_sample_info(sample_info)}")
+    reference_df, current_df, column_mapping = to_embedding_frames(train_embeddings, current_embeddings)
 
     # embedding_load에서 선택된 테스트 타입 사용
     if 'selected_test_type' in st.session_state:
@@ -159,13 +140,7 @@ def render():
                                     "Energy Distance"])
         st.warning("⚠️ Test type not set in Load page. Using local selection.")
 
-    test_methods = {
-        "MMD": mmd(threshold=0.015),
-        "Wasserstein Distance": ratio(component_stattest='wasserstein', component_stattest_threshold=0.1, threshold=0.015),
-        "KL Divergence": ratio(component_stattest='kl_div', component_stattest_threshold=0.1, threshold=0.015),
-        "JensenShannon Divergence": ratio(component_stattest='jensenshannon', component_stattest_threshold=0.1, threshold=0.015),
-        "Energy Distance": ratio(component_stattest='ed', component_stattest_threshold=0.1, threshold=0.015),
-    }
+    test_methods = get_drift_test_methods()
 
     # 대시보드용 Report 생성 및 저장
     selected_method = test_methods[test_option]
@@ -179,17 +154,18 @@ def render():
 
     # 모든 방법에 대한 드리프트 점수 요약 저장
     drift_summary = []
-    for name, method in test_methods.items():
+    for name, result in compute_drift_scores(train_embeddings, current_embeddings, test_methods).items():
+        if isinstance(result, Exception):
+            drift_summary.append(f"- {name}: failed ({result})")
+            continue
+        score, detected = result
         try:
-            temp_report = Report(metrics=[EmbeddingsDriftMetric('all_dimensions', drift_method=method)])
-            temp_report.run(reference_data=reference_df, current_data=current_df, column_mapping=column_mapping)
-            result = temp_report.as_dict().get("metrics", [])[0].get("result", {})
-            score = result.get("drift_score", "N/A")
-            detected = result.get("drift_detected", "N/A")
             drift_summary.append(f"- {name}: score = {score:.4f}, drift = {detected}")
         except Exception as e:
             drift_summary.append(f"- {name}: failed ({e})")
 
+    if sample_info:
+        drift_summary.append(f"- (sampled: {format_sample_info(sample_info)})")
     summary_text = "\n".join(drift_summary)
     st.session_state['drift_score_summary'] = summary_text
 
@@ -1,64 +1,147 @@
+import time
+import numpy as np
 import streamlit as st
-from pymilvus import connections, Collection, utility
+from pymilvus import Collection
 import json
 import datetime
-
-# Milvus 서버에 연결
-connections.connect("default", host="localhost", port="19530")
+from ...database.milvus_connection import ensure_milvus_connection
+from ..utils import format_sample_info
+from ..sampling import SAMPLE_OVERFETCH, SAMPLE_DEFAULT_SIZE, SAMPLE_DEFAULT_SEED, make_sample_plan, select_sample
+from ...database.metadata_store import list_data_collections, read_metadata
+from ...database.split_manifest import read_split_manifest, row_key_checksum
+from ...database.snapshot_cache import EmbeddingSnapshotCache, snapshot_version
+from ...database.milvus_utils import (SPLIT_PARTITIONS, QUERY_PAGE_SIZE, QUERY_MAX_PAGE_SIZE, is_partitioned,
+                                     get_split_partitions, ensure_vector_index, get_vector_storage, decode_vector,
+                                     count_rows, iter_query_pages)
 
 def get_collection_names():
-    return utility.list_collections()
+    # 메타데이터 컬렉션({name}__metadata)은 선택 목록에서 제외
+    return list_data_collections()
+
+@st.cache_resource
+def get_snapshot_cache():
+    """프로세스 전체에서 공유하는 임베딩 스냅샷 캐시"""
+    return EmbeddingSnapshotCache()
 
 def get_collection_fields(collection_name):
     collection = Collection(name=collection_name)
     return [field.name for field in collection.schema.fields]
 
-def load_collection(collection_name):
+def load_collection(collection_name, partition_names=None, manifest=None):
+    # 파티션을 지정하면 필요한 split만 메모리에 로드
     collection = Collection(name=collection_name)
-    collection.load()
+    # 삽입이 중단되어 인덱스가 없는 컬렉션은 로드 전에 인덱스 생성 (manifest에 기록된 삽입 시 인덱스/metric 사용)
+    index = (manifest or {}).get("index") or {}
+    index_kwargs = {key: index[key] for key in ("index_type", "metric_type") if index.get(key)}
+    ensure_vector_index(collection, **index_kwargs)
+    if partition_names:
+        collection.load(partition_names=partition_names)
+    else:
+        collection.load()
 
-def query_by_set_type(collection_name, set_types, output_fields, limit_per_type=10000):
+## split별 벡터를 미리 할당한 float32 배열에 페이지 단위로 바로 기록 (행별 dict/list를 남기지 않음)
+## 반환: {split: {"ids": int64 (N,), "vectors": float32 (N, dim), "labels": int32 코드 (N,), "classes": 라벨 목록,
+##              "population": split 전체 행 수, "sampled": 표본 여부}}
+## expected_rows(split manifest의 행 수)가 있으면 count(*) 쿼리 없이 배열 크기 결정
+## sample_plans({split: make_sample_plan 결과})가 있으면 층별로 표본 bucket만 조회 후 표본 수만큼 잘라냄
+def load_split_arrays(collection_name, set_types, page_size=QUERY_PAGE_SIZE, partitioned=False, on_progress=None,
+                      expected_rows=None, sample_plans=None, seed=SAMPLE_DEFAULT_SEED):
     collection = Collection(name=collection_name)
-    all_results = []
+    vector_storage = get_vector_storage(collection)
+    dim = next(int(field.params["dim"]) for field in collection.schema.fields if field.name == "vector")
+    sample_plans = sample_plans or {}
+    split_arrays = {}
 
     for stype in set_types:
-        expr = f"set_type == '{stype}'"
-        results = collection.query(expr=expr, output_fields=output_fields, limit=limit_per_type)
-        all_results.extend(results)
+        base_expr = f"set_type == '{stype}'"
+        partition_names = [stype] if partitioned else None
+        if expected_rows is not None and stype in expected_rows:
+            population = expected_rows[stype]
+        else:
+            population = count_rows(collection, base_expr, partition_names=partition_names)
+        strata = sample_plans.get(stype) or [("", None)]
+        total_rows = population if strata[0][1] is None else sum(take for _, take in strata)
+        capacity = total_rows if strata[0][1] is None else int(total_rows * SAMPLE_OVERFETCH) + 1
+        ids = np.empty(capacity, dtype=np.int64)
+        vectors = np.empty((capacity, dim), dtype=np.float32)
+        labels = np.empty(capacity, dtype=np.int32)
+        classes = {}
+        loaded_rows = 0
 
-    return all_results
+        for stratum_expr, take in strata:
+            expr = f"{base_expr} and {stratum_expr}" if stratum_expr else base_expr
+            stratum_start = loaded_rows
+            for page in iter_query_pages(collection, expr=expr, output_fields=["id", "class", "vector"],
+                                         page_size=page_size, partition_names=partition_names):
+                end = loaded_rows + len(page)
+                if end > len(vectors):
+                    # count 이후 삽입된 행이 있거나 표본 bucket이 예상보다 크면 배열 확장
+                    capacity = max(end, len(vectors) * 2)
+                    ids = np.resize(ids, capacity)
+                    vectors = np.resize(vectors, (capacity, dim))
+                    labels = np.resize(labels, capacity)
+                ids[loaded_rows:end] = [row["id"] for row in page]
+                labels[loaded_rows:end] = [classes.setdefault(row["class"], len(classes)) for row in page]
+                if vector_storage == "float32":
+                    vectors[loaded_rows:end] = [row["vector"] for row in page]
+                else:
+                    # float16 / bfloat16 저장 벡터는 float32로 올려서 기록
+                    for i, row in enumerate(page, start=loaded_rows):
+                        vectors[i] = decode_vector(row["vector"], vector_storage)
+                loaded_rows = end
+                if on_progress is not None:
+                    on_progress(stype, min(loaded_rows, total_rows), total_rows)
 
-def query_collection(collection_name, expr="", output_fields=None, limit=None):
-    collection = Collection(name=collection_name)
-    if expr:
-        results = collection.query(expr=expr, output_fields=output_fields)
-    else:
-        results = collection.query(expr="id >= 0", output_fields=output_fields, limit=limit or 100000)  # 충분히 큰 숫자
-    return results
+            if take is not None and loaded_rows - stratum_start > take:
+                # 층 안에서 key 순위가 낮은 take개만 남김 (원래 순서 유지)
+                keep = select_sample(ids[stratum_start:loaded_rows], take, seed) + stratum_start
+                stratum_end = stratum_start + take
+                ids[stratum_start:stratum_end] = ids[keep]
+                vectors[stratum_start:stratum_end] = vectors[keep]
+                labels[stratum_start:stratum_end] = labels[keep]
+                loaded_rows = stratum_end
+
+        split_arrays[stype] = {
+            "ids": ids[:loaded_rows],
+            "vectors": vectors[:loaded_rows],
+            "labels": labels[:loaded_rows],
+            "classes": list(classes),
+            "population": int(population),
+            "sampled": strata[0][1] is not None,
+        }
+
+    return split_arrays
+
+## 조회 진행률과 처리량(rows/s) 표시
+def make_progress_callback(progress_bar, started_at):
+    def on_progress(set_type, loaded_rows, total_rows):
+        elapsed = max(time.time() - started_at, 1e-6)
+        progress_bar.progress(min(loaded_rows / max(total_rows, 1), 1.0),
+                              text=f"{set_type}: {loaded_rows:,} / {total_rows:,} rows ({loaded_rows / elapsed:,.0f} rows/s)")
+    return on_progress
 
 # 사용자에게 데이터 설명을 위함
 def get_collection_metadata(collection_name):
-    collection = Collection(name=collection_name)
-    # 메타데이터 필드만 추출 (필요시 필드명 수정)
-    meta_fields = ["dataset_name", "timestamp"]
-    # 실제 존재하는 필드만 사용
-    fields = get_collection_fields(collection_name)
-    valid_meta_fields = [f for f in meta_fields if f in fields]
-    if not valid_meta_fields:
+    metadata = read_metadata(collection_name)
+    if not metadata:
         return {}
-    # 한 레코드만 조회
-    results = collection.query(expr="id >= 0", output_fields=valid_meta_fields, limit=1)
-    return results[0] if results else {}
+    return {"dataset_name": metadata.get("dataset_name"), "timestamp": metadata.get("timestamp"),
+            "manifest": read_split_manifest(collection_name, metadata)}
 
 # ----------------- main ------------------
 
 def render():
+    # Milvus 연결 (첫 사용 시 연결, 이후 재사용)
+    ensure_milvus_connection()
     collection_names = get_collection_names()
     collection_name = st.selectbox("Select the collection name", options=collection_names)
+    meta, manifest = {}, None
 
     if collection_name:
         meta = get_collection_metadata(collection_name)
         st.session_state['dataset_name'] = meta.get('dataset_name')
+        manifest = meta.get('manifest')
+        st.session_state['split_manifest'] = manifest
         
         if meta:
             # timestamp 변환
@@ -84,6 +167,15 @@ def render():
                 """,
                 unsafe_allow_html=True
             )
+            # split manifest가 있으면 스캔 없이 split 크기 표시
+            if manifest:
+                run_config = manifest.get("run_config", {})
+                st.caption(f"dim: {manifest['dim']} · model: {run_config.get('model', 'N/A')} · "
+                           f"storage: {run_config.get('vector_storage', 'float32')}")
+                st.dataframe(
+                    [{"split": split, "rows": info["rows"]} for split, info in manifest["splits"].items()],
+                    hide_index=True
+                )
         else:
             st.info("No metadata found for this collection.")
     
@@ -122,27 +214,134 @@ def render():
     # 선택된 설정 표시
     st.info(f"🎯 **Selected Configuration:** Dimension={selected_dimension}, Test Type={selected_test_type}")
 
+    selected_splits = st.multiselect(
+        "Splits to load", options=SPLIT_PARTITIONS, default=SPLIT_PARTITIONS, key="selected_splits",
+        help="train(reference)과 비교 split(valid/test) 하나 이상이 필요합니다. "
+             "드리프트 탐지는 test(current)를, test가 없으면 valid를 사용합니다."
+    )
+    if "train" not in selected_splits or not set(selected_splits) & {"valid", "test"}:
+        st.warning("Select train and at least one of valid / test.")
+        return
+    page_size = st.number_input("Query Page Size", min_value=100, max_value=QUERY_MAX_PAGE_SIZE, value=QUERY_PAGE_SIZE,
+                                step=512, key="query_page_size")
+    load_mode = st.radio(
+        "Load Mode", ["Full", "Stratified Sample"], horizontal=True, key="load_mode",
+        help="Stratified Sample: split별로 class 비율을 유지한 재현 가능한 표본만 Milvus에서 조회합니다 (대화형 탐색용)."
+    )
+    sample_size, sample_seed = None, SAMPLE_DEFAULT_SEED
+    if load_mode == "Stratified Sample":
+        col1, col2 = st.columns(2)
+        sample_size = col1.number_input("Sample Size per Split", min_value=100, value=SAMPLE_DEFAULT_SIZE, step=1000,
+                                        key="sample_size")
+        sample_seed = col2.number_input("Sample Seed", min_value=0, value=SAMPLE_DEFAULT_SEED, step=1,
+                                        key="sample_seed")
+    use_snapshot_cache = st.checkbox(
+        "Use local snapshot cache", value=True, key="use_snapshot_cache",
+        help="같은 버전의 컬렉션은 Milvus 조회 없이 로컬 .npy 스냅샷을 memory-map으로 엽니다. "
+             "최대 크기는 EMBEDDING_SNAPSHOT_MAX_BYTES 환경변수로 설정합니다."
+    )
+
     if st.button("Load Data"):
 
-        # 컬렉션의 필드 이름 확인, 필드 설정
+        # 컬렉션의 필드 이름 확인
         fields = get_collection_fields(collection_name)
-        output_fields = ["id", "set_type", "class", "vector"]
-        valid_fields = [field for field in output_fields if field in fields]
+        missing_fields = [field for field in ["id", "set_type", "class", "vector"] if field not in fields]
 
-        if not valid_fields:
-            st.error("No valid fields to query in the selected collection.")
+        if missing_fields:
+            st.error(f"The selected collection is missing required fields: {missing_fields}")
             return
         
-        load_collection(collection_name)
-
-        # 미리 set_type 값 추출
         collection = Collection(name=collection_name)
-        set_type_results = collection.query(expr="id >= 0", output_fields=["set_type"], limit=10000)
-        set_types = set([res["set_type"] for res in set_type_results])
+        expected_rows = None
+        if manifest:
+            # manifest 기준으로 로드 계획 (set_type 탐색/count 쿼리 없음, 컬렉션 로드는 스냅샷 확인 후)
+            partitioned = manifest.get("partitioned", False)
+            expected_rows = {split: info["rows"] for split, info in manifest["splits"].items()}
+            set_types = [split for split in selected_splits if expected_rows.get(split, 0) > 0]
+        elif is_partitioned(collection):
+            partitioned = True
+            # split 파티션 통계로 set_type 확인 후 선택된 파티션만 로드
+            set_types = [split for split in get_split_partitions(collection) if split in selected_splits]
+            load_collection(collection_name, partition_names=set_types, manifest=manifest)
+        else:
+            partitioned = False
+            # 파티션 도입 전 컬렉션: 전체 로드 후 split별 count(*)로 set_type 확인 (메타데이터 행은 제외됨)
+            load_collection(collection_name, manifest=manifest)
+            set_types = [split for split in selected_splits
+                         if count_rows(collection, f"set_type == '{split}'") > 0]
         st.write(f"📌 Detected set_type values: `{set_types}`")
 
-        results = query_by_set_type(collection_name, set_types, valid_fields)
-        st.session_state['embedding_data'] = results
-        st.success("✅ Embedding data successfully loaded and stored in session state.")
+        # 표본 로드: manifest의 class별 행 수로 층화 (없으면 split 전체를 하나의 층으로 균등 표본)
+        sample_plans = {}
+        if sample_size:
+            for split in set_types:
+                split_info = manifest["splits"].get(split, {}) if manifest else {}
+                class_counts = split_info.get("classes") or {
+                    None: split_info.get("rows") or count_rows(collection, f"set_type == '{split}'",
+                                                               partition_names=[split] if partitioned else None)
+                }
+                sample_plans[split] = make_sample_plan(split, class_counts, int(sample_size), seed=int(sample_seed))
+            if not all(manifest and manifest["splits"].get(split, {}).get("classes") for split in set_types):
+                st.info("ℹ️ No class counts in the split manifest: sampling uniformly within each split (not stratified).")
+
+        started_at = time.time()
+        # 같은 버전 스냅샷이 있는 split은 Milvus 대신 로컬 memmap 사용 (표본 로드는 캐시하지 않음)
+        snapshot_cache = get_snapshot_cache() if use_snapshot_cache and not sample_size else None
+        version = snapshot_version(manifest, meta.get('timestamp')) if snapshot_cache else None
+        split_arrays = {}
+        if version is not None:
+            for split in set_types:
+                cached = snapshot_cache.get(collection_name, version, split)
+                if cached is not None:
+                    split_arrays[split] = cached
+            if split_arrays:
+                st.write(f"💾 Loaded from local snapshot: `{list(split_arrays)}`")
+
+        missing_splits = [split for split in set_types if split not in split_arrays]
+        if missing_splits:
+            if manifest:
+                load_collection(collection_name, partition_names=missing_splits if partitioned else None,
+                                manifest=manifest)
+            progress_bar = st.progress(0, text="Loading embeddings...")
+            loaded = load_split_arrays(collection_name, missing_splits, page_size=page_size, partitioned=partitioned,
+                                       on_progress=make_progress_callback(progress_bar, started_at),
+                                       expected_rows=expected_rows, sample_plans=sample_plans, seed=int(sample_seed))
+            progress_bar.empty()
+            for split, arrays in loaded.items():
+                # manifest 체크섬과 로드한 row key 비교 (manifest 이후 변경/누락 확인)
+                expected_checksum = manifest["splits"].get(split, {}).get("checksum") if manifest else None
+                if arrays["sampled"]:
+                    split_arrays[split] = arrays
+                elif expected_checksum and row_key_checksum(arrays["ids"]) != expected_checksum:
+                    st.warning(f"⚠️ {split}: loaded rows ({len(arrays['ids']):,}) do not match the split manifest "
+                               f"({manifest['splits'][split]['rows']:,} rows). Re-run the Vector Database step.")
+                    split_arrays[split] = arrays
+                elif version is not None:
+                    # 스냅샷으로 저장한 뒤 memmap으로 다시 열어 메모리 사본을 유지하지 않음
+                    split_arrays[split] = snapshot_cache.put(collection_name, version, split, arrays)
+                else:
+                    split_arrays[split] = arrays
+        split_arrays = {split: split_arrays[split] for split in set_types}
+
+        # 행별 dict 목록 대신 split별 numpy 배열을 세션에 저장
+        st.session_state.pop('embedding_data', None)
+        st.session_state['embedding_arrays'] = split_arrays
+        # 표본으로 계산된 결과임을 시각화/드리프트 페이지에 표시하기 위한 정보
+        st.session_state['embedding_sample'] = {
+            split: {"rows": len(arrays["ids"]), "population": arrays["population"]}
+            for split, arrays in split_arrays.items() if arrays.get("sampled")
+        } or None
+        total_rows = sum(len(arrays["ids"]) for arrays in split_arrays.values())
+        total_mb = sum(arrays["vectors"].nbytes for arrays in split_arrays.values()) / 1024 ** 2
+        elapsed = max(time.time() - started_at, 1e-6)
+        st.success(f"✅ Embedding data successfully loaded and stored in session state "
+                   f"({total_rows:,} rows, {total_mb:,.1f} MB, {total_rows / elapsed:,.0f} rows/s).")
+        if st.session_state['embedding_sample']:
+            st.warning(f"🎲 Sampled load (seed {int(sample_seed)}): {format_sample_info(st.session_state['embedding_sample'])}. "
+                       f"Visualizations and drift scores are approximate.")
+        if snapshot_cache is not None:
+            stats = snapshot_cache.stats()
+            st.caption(f"💾 Snapshot cache: {stats['entries']} snapshots, "
+                       f"{stats['size_mb']:,.1f} / {stats['capacity_mb']:,.0f} MB, {stats['evictions']} evicted")
 
     return
\ No newline at end of file
@@ -6,24 +6,28 @@ import seaborn as sns
 from sklearn.decomposition import PCA
 import warnings
 import os
-from ..utils import visualize_similarity_distance, plot_reduced
+from ..utils import visualize_similarity_distance, plot_reduced, format_sample_info
 
 warnings.filterwarnings("ignore")
 
 def render():
-    if 'embedding_data' not in st.session_state or not st.session_state['embedding_data']:
-        st.error("'embedding_data' is not initialized or empty. Please load it from VectorDB.")
+    if 'embedding_arrays' not in st.session_state or not st.session_state['embedding_arrays']:
+        st.error("'embedding_arrays' is not initialized or empty. Please load it from VectorDB.")
         return
 
-    embedding_data = st.session_state['embedding_data']
+    embedding_arrays = st.session_state['embedding_arrays']
     dataset_name = st.session_state.get('dataset_name')
     st.write(f"Embedding Visualization of {dataset_name}")
+    sample_info = st.session_state.get('embedding_sample')
+    if sample_info:
+        st.warning(f"🎲 Computed on a sample: {format_sample_info(sample_info)}")
 
-    # 데이터셋 분리 함수
+    # split별 float32 배열 (로드 시 미리 할당된 배열을 그대로 사용)
     def extract_embeddings(key):
-        return np.array([
-            res["vector"] for res in embedding_data if res.get("set_type", "").lower() == key
-        ], dtype=np.float32)
+        arrays = embedding_arrays.get(key)
+        if arrays is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return arrays["vectors"]
 
     train_embeddings = extract_embeddings("train")
     valid_embeddings = extract_embeddings("valid")
@@ -37,6 +41,7 @@ def render():
         f"Train: {train_embeddings.shape}, "
         f"Valid: {valid_embeddings.shape}, "
         f"Test: {test_embeddings.shape}"
+        + (f" (sampled: {format_sample_info(sample_info)})" if sample_info else "")
     )
     st.session_state['embedding_size'] = (
         f"Train: {train_embeddings.shape}, "
@@ -47,9 +52,16 @@ def render():
     # 정보 출력
     st.write(st.session_state['embedding_overview_text'])
 
-    if train_embeddings.size == 0 or valid_embeddings.size == 0 or test_embeddings.size == 0:
-        st.error("One or more embedding datasets are empty. Please check the data.")
+    # train(reference)과 비교 split(valid/test) 중 하나 이상 필요, 로드하지 않은 split은 건너뜀
+    if train_embeddings.size == 0:
+        st.error("Train embeddings are empty. Please load the train split from VectorDB.")
         return
+    if valid_embeddings.size == 0 and test_embeddings.size == 0:
+        st.error("Load at least one of the valid / test splits to compare with train.")
+        return
+    skipped = [split for split, arr in [("valid", valid_embeddings), ("test", test_embeddings)] if arr.size == 0]
+    if skipped:
+        st.info(f"ℹ️ `{skipped}` not loaded: comparing train with the loaded splits only.")
 
     # 🔷 Original Dimension 시각화
     st.subheader("Original Dimension")
@@ -91,6 +103,13 @@ def render():
         dim_option = st.selectbox("Select Size of Dimension", [10, 50, 100, 200, 300, 400, 500])
         st.warning("⚠️ Dimension not set in Load page. Using local selection.")
 
+    # 쓰기 시점에 차원 축소된 컬렉션은 저장된 차원 이하로 제한
+    max_dim = min(train_embeddings.shape[1], len(train_embeddings),
+                  *[len(arr) for arr in [valid_embeddings, test_embeddings] if arr.size > 0])
+    if dim_option > max_dim:
+        st.warning(f"⚠️ Stored embeddings support at most {max_dim} PCA components. Using {max_dim}.")
+        dim_option = max_dim
+
     st.session_state['pca_selected_dim'] = dim_option
 
     @st.cache_data
@@ -98,8 +117,8 @@ def render():
         return PCA(n_components=n_components).fit_transform(embeddings)
 
     train_pca = apply_pca(train_embeddings, dim_option)
-    valid_pca = apply_pca(valid_embeddings, dim_option)
-    test_pca = apply_pca(test_embeddings, dim_option)
+    valid_pca = apply_pca(valid_embeddings, dim_option) if valid_embeddings.size > 0 else None
+    test_pca = apply_pca(test_embeddings, dim_option) if test_embeddings.size > 0 else None
 
     # PCA 적용된 임베딩을 세션에 저장 (detect_datadrift에서 사용)
     st.session_state['train_embeddings_pca'] = train_pca
@@ -107,8 +126,10 @@ def render():
     st.session_state['test_embeddings_pca'] = test_pca
 
     st.write(f"Train PCA shape: {train_pca.shape}")
-    st.write(f"Validation PCA shape: {valid_pca.shape}")
-    st.write(f"Test PCA shape: {test_pca.shape}")
+    if valid_pca is not None:
+        st.write(f"Validation PCA shape: {valid_pca.shape}")
+    if test_pca is not None:
+        st.write(f"Test PCA shape: {test_pca.shape}")
 
     st.markdown(f"<b>PCA Reduced Dimension:</b> {dim_option}", unsafe_allow_html=True)
 
@@ -0,0 +1,42 @@
+import json
+import hashlib
+import numpy as np
+
+## --------------- Stratified Sampling --------------- ##
+# 목표 표본보다 조금 더 조회한 뒤 잘라내어 bucket 크기 편차로 표본이 모자라지 않게 함
+SAMPLE_OVERFETCH = 1.1
+SAMPLE_DEFAULT_SIZE = 20_000
+SAMPLE_DEFAULT_SEED = 42
+
+def stable_hash(*parts):
+    return int.from_bytes(hashlib.sha256("\x00".join(map(str, parts)).encode("utf-8")).digest()[:8], "big")
+
+def key_rank(ids, seed):
+    """primary key 기반 재현 가능한 난수 순위 (같은 seed면 같은 행이 선택됨)"""
+    mixed = ids.astype(np.uint64) ^ np.uint64(stable_hash(seed) & 0xFFFF_FFFF_FFFF_FFFF)
+    mixed = mixed * np.uint64(0x9E37_79B9_7F4A_7C15)
+    return mixed ^ (mixed >> np.uint64(31))
+
+def make_sample_plan(split, class_counts, sample_size, seed=SAMPLE_DEFAULT_SEED):
+    """class별 (필터 식, 표본 수) 목록 (class 비율대로 표본 배분)
+
+    class별로 primary key를 modulus개 bucket으로 나누어 seed로 고른 bucket 하나만 Milvus에서 조회
+    (id % modulus == remainder) → 표본 행만 전송, class_counts가 None이면 split 전체를 하나의 층으로 처리
+    """
+    total = sum(class_counts.values())
+    if sample_size >= total:
+        return None
+
+    plan = []
+    for label, count in class_counts.items():
+        take = min(count, max(1, round(sample_size * count / total)))
+        modulus = max(1, int(count / (take * SAMPLE_OVERFETCH)))
+        filters = [] if label is None else [f"class == {json.dumps(label, ensure_ascii=False)}"]
+        if modulus > 1:
+            filters.append(f"id % {modulus} == {stable_hash(seed, split, label) % modulus}")
+        plan.append((" and ".join(filters), take))
+    return plan
+
+def select_sample(ids, take, seed=SAMPLE_DEFAULT_SEED):
+    """key 순위가 낮은 take개 행의 위치 (원래 순서 유지)"""
+    return np.sort(np.argsort(key_rank(np.asarray(ids, dtype=np.int64), seed), kind="stable")[:take])
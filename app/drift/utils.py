@@ -24,6 +24,10 @@ def load_data():
 
     return train_df, valid_df, test_df
 
+def format_sample_info(sample_info):
+    """표본 로드 정보 표시 문자열 (예: train 20,000 of 5,000,000)"""
+    return ", ".join(f"{split} {info['rows']:,} of {info['population']:,}" for split, info in sample_info.items())
+
 def split_columns(df):
     if df is None:
         raise ValueError("Dataframe is None!")
@@ -46,26 +50,24 @@ def split_columns(df):
 
 
 ## --------------- Visualization --------------- ##
+def comparison_pairs(valid, test, label_valid="Valid", label_test="Test"):
+    """train과 비교할 (라벨, 배열) 목록 (로드하지 않은 split은 제외)"""
+    return [(label, arr) for label, arr in [(label_valid, valid), (label_test, test)] if arr is not None and len(arr) > 0]
+
 def visualize_similarity_distance(valid_embeddings, test_embeddings, train_embeddings):
     try:
-        cosine_valid_train = cosine_similarity(valid_embeddings, train_embeddings)
-        cosine_test_train = cosine_similarity(test_embeddings, train_embeddings)
-        euclidean_valid_train = euclidean_distances(valid_embeddings, train_embeddings)
-        euclidean_test_train = euclidean_distances(test_embeddings, train_embeddings)
-
-        fig, axes = plt.subplots(1, 4, figsize=(20, 5))
-
-        sns.heatmap(cosine_valid_train, cmap="YlGnBu", xticklabels=False, yticklabels=False, ax=axes[0])
-        axes[0].set_title("Cosine: Valid-Train")
-
-        sns.heatmap(cosine_test_train, cmap="YlGnBu", xticklabels=False, yticklabels=False, ax=axes[1])
-        axes[1].set_title("Cosine: Test-Train")
+        pairs = comparison_pairs(valid_embeddings, test_embeddings)
+        fig, axes = plt.subplots(1, 2 * len(pairs), figsize=(10 * len(pairs), 5), squeeze=False)
+        axes = axes[0]
 
-        sns.heatmap(euclidean_valid_train, cmap="YlGnBu", xticklabels=False, yticklabels=False, ax=axes[2])
-        axes[2].set_title("Euclidean: Valid-Train")
+        for i, (label, embeddings) in enumerate(pairs):
+            cosine = cosine_similarity(embeddings, train_embeddings)
+            sns.heatmap(cosine, cmap="YlGnBu", xticklabels=False, yticklabels=False, ax=axes[i])
+            axes[i].set_title(f"Cosine: {label}-Train")
 
-        sns.heatmap(euclidean_test_train, cmap="YlGnBu", xticklabels=False, yticklabels=False, ax=axes[3])
-        axes[3].set_title("Euclidean: Test-Train")
+            euclidean = euclidean_distances(embeddings, train_embeddings)
+            sns.heatmap(euclidean, cmap="YlGnBu", xticklabels=False, yticklabels=False, ax=axes[len(pairs) + i])
+            axes[len(pairs) + i].set_title(f"Euclidean: {label}-Train")
 
         plt.tight_layout()
         return fig
@@ -76,101 +78,53 @@ def visualize_similarity_distance(valid_embeddings, test_embeddings, train_embed
 
 def plot_reduced(valid_pca, test_pca, train_pca, 
                  label_valid="Valid", label_test="Test", label_train="Train"):
-    fig, axes = plt.subplots(1, 6, figsize=(30, 5))  # 1x6 플롯 생성
+    # 로드된 비교 split(valid/test)마다 2D scatter, 2D density, 3D scatter 한 장씩
+    pairs = comparison_pairs(valid_pca, test_pca, label_valid, label_test)
+    n_pairs = len(pairs)
+    fig, axes = plt.subplots(1, 3 * n_pairs, figsize=(15 * n_pairs, 5), squeeze=False)
+    axes = axes[0]
     colors = {label_train: "orange", label_valid: "blue", label_test: "green"}
 
-    # 2D Scatter Plot (valid-train)
-    axes[0].scatter(train_pca[:, 0], train_pca[:, 1], alpha=0.5, label=label_train, c=colors[label_train])
-    axes[0].scatter(valid_pca[:, 0], valid_pca[:, 1], alpha=0.5, label=label_valid, c=colors[label_valid])
-    axes[0].set_title("2D Scatter Plot (valid-train)", fontsize=12)
-    axes[0].set_xlabel("PC1", fontsize=10)
-    axes[0].set_ylabel("PC2", fontsize=10)
-    axes[0].legend()
-    axes[0].grid(alpha=0.3)
-
-    # 2D Scatter Plot (test-train)
-    axes[1].scatter(train_pca[:, 0], train_pca[:, 1], alpha=0.5, label=label_train, c=colors[label_train])
-    axes[1].scatter(test_pca[:, 0], test_pca[:, 1], alpha=0.5, label=label_test, c=colors[label_test])
-    axes[1].set_title("2D Scatter Plot (test-train)", fontsize=12)
-    axes[1].set_xlabel("PC1", fontsize=10)
-    axes[1].set_ylabel("PC2", fontsize=10)
-    axes[1].legend()
-    axes[1].grid(alpha=0.3)
-
-    # 2D Density Plot (valid-train)
-    sns.kdeplot(x=train_pca[:, 0], y=train_pca[:, 1], ax=axes[2], fill=True, alpha=0.5, color=colors[label_train])
-    sns.kdeplot(x=valid_pca[:, 0], y=valid_pca[:, 1], ax=axes[2], fill=True, alpha=0.5, color=colors[label_valid])
-    axes[2].set_title("2D Density Plot (valid-train)", fontsize=12)
-    axes[2].set_xlabel("PC1", fontsize=10)
-    axes[2].set_ylabel("PC2", fontsize=10)
-    handles2 = [
-        mlines.Line2D([], [], color=colors[label_train], label=label_train),
-        mlines.Line2D([], [], color=colors[label_valid], label=label_valid)
-    ]
-    axes[2].legend(handles=handles2)
-    axes[2].grid(alpha=0.3)
-
-    # 2D Density Plot (test-train)
-    sns.kdeplot(x=train_pca[:, 0], y=train_pca[:, 1], ax=axes[3], fill=True, alpha=0.5, color=colors[label_train])
-    sns.kdeplot(x=test_pca[:, 0], y=test_pca[:, 1], ax=axes[3], fill=True, alpha=0.5, color=colors[label_test])
-    axes[3].set_title("2D Density Plot (test-train)", fontsize=12)
-    axes[3].set_xlabel("PC1", fontsize=10)
-    axes[3].set_ylabel("PC2", fontsize=10)
-    handles3 = [
-        mlines.Line2D([], [], color=colors[label_train], label=label_train),
-        mlines.Line2D([], [], color=colors[label_test], label=label_test)
-    ]
-    axes[3].legend(handles=handles3)
-    axes[3].grid(alpha=0.3)
-
-    # 3D Scatter Plot (valid-train)
-    ax_3d_valid = fig.add_subplot(1, 6, 5, projection="3d")
-    ax_3d_valid.scatter(train_pca[:, 0], train_pca[:, 1], train_pca[:, 2], alpha=0.5, label=label_train, c=colors[label_train])
-    ax_3d_valid.scatter(valid_pca[:, 0], valid_pca[:, 1], valid_pca[:, 2], alpha=0.5, label=label_valid, c=colors[label_valid])
-    ax_3d_valid.set_title("3D Scatter Plot (valid-train)", fontsize=12)
-    ax_3d_valid.set_xlabel("PC1", fontsize=10)
-    ax_3d_valid.set_ylabel("PC2", fontsize=10)
-    ax_3d_valid.set_zlabel("PC3", fontsize=10)
-    ax_3d_valid.legend()
-
-    # 3D Scatter Plot (test-train)
-    ax_3d_test = fig.add_subplot(1, 6, 6, projection="3d")
-    ax_3d_test.scatter(train_pca[:, 0], train_pca[:, 1], train_pca[:, 2], alpha=0.5, label=label_train, c=colors[label_train])
-    ax_3d_test.scatter(test_pca[:, 0], test_pca[:, 1], test_pca[:, 2], alpha=0.5, label=label_test, c=colors[label_test])
-    ax_3d_test.set_title("3D Scatter Plot (test-train)", fontsize=12)
-    ax_3d_test.set_xlabel("PC1", fontsize=10)
-    ax_3d_test.set_ylabel("PC2", fontsize=10)
-    ax_3d_test.set_zlabel("PC3", fontsize=10)
-    ax_3d_test.legend()
+    for i, (label, pca) in enumerate(pairs):
+        pair_name = f"{label.lower()}-{label_train.lower()}"
+
+        # 2D Scatter Plot
+        ax = axes[i]
+        ax.scatter(train_pca[:, 0], train_pca[:, 1], alpha=0.5, label=label_train, c=colors[label_train])
+        ax.scatter(pca[:, 0], pca[:, 1], alpha=0.5, label=label, c=colors[label])
+        ax.set_title(f"2D Scatter Plot ({pair_name})", fontsize=12)
+        ax.set_xlabel("PC1", fontsize=10)
+        ax.set_ylabel("PC2", fontsize=10)
+        ax.legend()
+        ax.grid(alpha=0.3)
+
+        # 2D Density Plot
+        ax = axes[n_pairs + i]
+        sns.kdeplot(x=train_pca[:, 0], y=train_pca[:, 1], ax=ax, fill=True, alpha=0.5, color=colors[label_train])
+        sns.kdeplot(x=pca[:, 0], y=pca[:, 1], ax=ax, fill=True, alpha=0.5, color=colors[label])
+        ax.set_title(f"2D Density Plot ({pair_name})", fontsize=12)
+        ax.set_xlabel("PC1", fontsize=10)
+        ax.set_ylabel("PC2", fontsize=10)
+        handles = [
+            mlines.Line2D([], [], color=colors[label_train], label=label_train),
+            mlines.Line2D([], [], color=colors[label], label=label)
+        ]
+        ax.legend(handles=handles)
+        ax.grid(alpha=0.3)
+
+        # 3D Scatter Plot
+        ax_3d = fig.add_subplot(1, 3 * n_pairs, 2 * n_pairs + i + 1, projection="3d")
+        ax_3d.scatter(train_pca[:, 0], train_pca[:, 1], train_pca[:, 2], alpha=0.5, label=label_train, c=colors[label_train])
+        ax_3d.scatter(pca[:, 0], pca[:, 1], pca[:, 2], alpha=0.5, label=label, c=colors[label])
+        ax_3d.set_title(f"3D Scatter Plot ({pair_name})", fontsize=12)
+        ax_3d.set_xlabel("PC1", fontsize=10)
+        ax_3d.set_ylabel("PC2", fontsize=10)
+        ax_3d.set_zlabel("PC3", fontsize=10)
+        ax_3d.legend()
 
     plt.tight_layout()
     return fig
 
 ## --------------- Embedding --------------- ##
-class EmbeddingPipeline:
-    def __init__(self, model_name="klue/roberta-base", device=None):
-        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
-        self.model_name = model_name
-        self.tokenizer = None
-        self.model = None
-
-    def load_model(self):
-        # 세션 상태를 사용하여 모델 로드 과정을 최적화
-        if 'tokenizer' not in st.session_state or 'model' not in st.session_state:
-            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name, use_fast=False)
-            self.model = AutoModel.from_pretrained(self.model_name).to(self.device)
-            st.session_state['tokenizer'] = self.tokenizer
-            st.session_state['model'] = self.model
-        else:
-            self.tokenizer = st.session_state['tokenizer']
-            self.model = st.session_state['model']
-
-    class CustomDataset(Dataset):
-        def __init__(self, dataframe, text_col):
-            self.texts = dataframe[text_col]
-
-        def __len__(self):
-            return len(self.texts)
-
-        def __getitem__(self, idx):
-            return self.texts.iloc[idx]
+# 임베딩 파이프라인은 database 모듈의 구현을 공유 (client 모드로 임베딩 서버 사용 가능)
+from ..database.utils import EmbeddingPipeline
@@ -3,30 +3,21 @@ import json
 import base64
 import streamlit as st
 import pandas as pd
-from pymilvus import connections, Collection, utility
+from pymilvus import utility
+from ...database.milvus_connection import ensure_milvus_connection
+from ...database.metadata_store import list_data_collections, read_metadata
 
 # ------------------------------------- Milvus 메타데이터 로드 -------------------------------------
 def metadata_milvus(collection_name):
-    connections.connect("default", host="localhost", port="19530")
+    ensure_milvus_connection()
 
     if not utility.has_collection(collection_name):
         return None
     
-    collection = Collection(name=collection_name)
-    collection.load()
-    
-    # 메타데이터 타입의 데이터만 쿼리
-    results = collection.query(
-                expr="set_type == 'metadata'",
-                output_fields=["dataset_name", "summary_dict", "data_previews", 
-                            "class_dist_path", "doc_len_path", "doc_len_table", "wordcloud_path",
-                            # 추가 사항
-                            "dimension", "embedding_size", "original_distance_path",
-                            "PCA_distance_path", "PCA_visualization_path", "drift_score_summary"
-                            ],
-                limit=1
-                )
-    metadata = results[0]
+    # 메타데이터 컬렉션에서 조회
+    metadata = read_metadata(collection_name)
+    if not metadata:
+        return None
     
     # JSON 문자열을 딕셔너리로 파싱
     def safe_json_parse(value, default={}):
@@ -63,8 +54,8 @@ def search_metadata(dataset_name):
     if not dataset_name:
         dataset_name = 'Dataset'
     
-    connections.connect("default", host="localhost", port="19530")
-    collections = utility.list_collections()
+    ensure_milvus_connection()
+    collections = list_data_collections()
     
     # 모든 컬렉션에서 해당 데이터셋 검색
     for collection_name in collections:
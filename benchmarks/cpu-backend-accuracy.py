@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from transformers import AutoTokenizer
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(current_dir))
+
+from app.database.utils import EmbeddingPipeline, load_encoder, split_columns, EMBEDDING_BACKENDS
+
+def build_pipeline(model_name: str, backend: str) -> EmbeddingPipeline:
+    # streamlit 세션 없이 실행하므로 load_model 대신 직접 로드
+    pipeline = EmbeddingPipeline(model_name=model_name, device="cpu", backend=backend)
+    pipeline.tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=pipeline.use_fast)
+    pipeline.model = load_encoder(model_name, pipeline.device, backend)
+    return pipeline
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU backend별 CLS 임베딩 정확도(fp32 대비) 및 처리량 확인")
+    parser.add_argument("--csv", default=os.path.join(os.path.dirname(current_dir), "docs/drift_data/law/test_data.csv"))
+    parser.add_argument("--model", default="klue/roberta-base")
+    parser.add_argument("--rows", type=int, default=512)
+    parser.add_argument("--backends", default="int8,onnx")
+    parser.add_argument("--min-cosine", type=float, default=0.99, help="fp32 대비 허용 최소 cosine similarity")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv).head(args.rows)
+    text_col, _ = split_columns(df)
+
+    results = {}
+    for backend in ["torch"] + [b for b in args.backends.split(",") if b in EMBEDDING_BACKENDS and b != "torch"]:
+        pipeline = build_pipeline(args.model, backend)
+        start = time.perf_counter()
+        embeddings = pipeline.generate_embeddings(df, text_col, num_workers=0)
+        results[backend] = (embeddings, time.perf_counter() - start)
+
+    reference, reference_time = results["torch"]
+    reference_norm = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+
+    failed = False
+    print(f"{'backend':>8} | {'rows/s':>8} | {'speedup':>7} | {'min cos':>8} | {'mean cos':>8} | {'max |diff|':>10}")
+    for backend, (embeddings, elapsed) in results.items():
+        cosine = np.sum(reference_norm * (embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)), axis=1)
+        max_diff = float(np.abs(reference - embeddings).max())
+        ok = cosine.min() >= args.min_cosine
+        failed |= not ok
+        print(f"{backend:>8} | {len(df) / elapsed:>8.1f} | {reference_time / elapsed:>6.2f}x | "
+              f"{cosine.min():>8.4f} | {cosine.mean():>8.4f} | {max_diff:>10.2e} {'✅' if ok else '❌'}")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
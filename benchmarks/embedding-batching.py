@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from transformers import AutoTokenizer, AutoModel
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(current_dir))
+
+from app.database.utils import EMBEDDING_LOADER_WORKERS, EmbeddingPipeline, split_columns
+
+def build_pipeline(model_name: str) -> EmbeddingPipeline:
+    # streamlit 세션 없이 실행하므로 load_model 대신 직접 로드
+    pipeline = EmbeddingPipeline(model_name=model_name)
+    pipeline.tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=pipeline.use_fast)
+    pipeline.model = AutoModel.from_pretrained(model_name).to(pipeline.device)
+    return pipeline
+
+def bench(pipeline, df, text_col, **kwargs):
+    start = time.perf_counter()
+    embeddings = pipeline.generate_embeddings(df, text_col, **kwargs)
+    elapsed = time.perf_counter() - start
+    return embeddings, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="fixed vs token_budget 배치 처리량 비교")
+    parser.add_argument("--csv", default=os.path.join(os.path.dirname(current_dir), "docs/drift_data/law/train_data.csv"))
+    parser.add_argument("--model", default="klue/roberta-base")
+    parser.add_argument("--rows", default="256,1024,4000")
+    parser.add_argument("--max-len", type=int, default=128)
+    parser.add_argument("--max-tokens", type=int, default=4096)
+    parser.add_argument("--num-workers", type=int, default=EMBEDDING_LOADER_WORKERS,
+                        help="0이면 앱과 같은 thread prefetch, 1 이상이면 DataLoader worker 프로세스")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv)
+    text_col, _ = split_columns(df)
+    pipeline = build_pipeline(args.model)
+
+    print(f"📦 {args.csv} (device: {pipeline.device})")
+    print(f"{'rows':>8} | {'fixed rows/s':>13} | {'budget rows/s':>13} | {'speedup':>7} | {'max |diff|':>10}")
+    for n_rows in [int(n) for n in args.rows.split(",")]:
+        sample = df.head(n_rows)
+        fixed, fixed_time = bench(pipeline, sample, text_col, max_len=args.max_len, num_workers=args.num_workers)
+        budget, budget_time = bench(pipeline, sample, text_col, max_len=args.max_len,
+                                    batching="token_budget", max_tokens=args.max_tokens,
+                                    num_workers=args.num_workers)
+        # 행 순서 복원 여부 확인
+        max_diff = float(np.abs(fixed - budget).max())
+        print(f"{len(sample):>8} | {len(sample) / fixed_time:>13.1f} | {len(sample) / budget_time:>13.1f} | "
+              f"{fixed_time / budget_time:>6.2f}x | {max_diff:>10.2e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+import argparse
+import threading
+import numpy as np
+import pandas as pd
+import requests
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(current_dir))
+
+from app.database.embedding_server import decode_array, EMBEDDING_SERVER_HOST, EMBEDDING_SERVER_PORT
+
+def caller(url, texts, rows_per_request, num_requests, max_len, seed, latencies, errors):
+    rng = np.random.default_rng(seed)
+    for _ in range(num_requests):
+        idx = rng.integers(0, len(texts), size=rows_per_request)
+        start = time.perf_counter()
+        try:
+            response = requests.post(f"{url}/embed", json={"texts": [texts[i] for i in idx], "max_len": max_len}, timeout=600)
+            response.raise_for_status()
+            decode_array(response.json())
+            latencies.append(time.perf_counter() - start)
+        except Exception as e:
+            errors.append(str(e))
+
+def main():
+    parser = argparse.ArgumentParser(description="임베딩 서버 동시 요청 부하 테스트 (처리량 / p99 지연)")
+    parser.add_argument("--url", default=f"http://{EMBEDDING_SERVER_HOST}:{EMBEDDING_SERVER_PORT}")
+    parser.add_argument("--csv", default=os.path.join(os.path.dirname(current_dir), "docs/drift_data/kohate/train_split.csv"))
+    parser.add_argument("--callers", default="1,4,16")
+    parser.add_argument("--requests", type=int, default=20, help="caller당 요청 수")
+    parser.add_argument("--rows", type=int, default=8, help="요청당 행 수")
+    parser.add_argument("--max-len", type=int, default=128)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv)
+    text_col = max(df.columns, key=lambda col: df[col].dropna().astype(str).str.len().max())
+    texts = df[text_col].astype(str).tolist()
+
+    info = requests.get(f"{args.url}/health", timeout=10).json()
+    print(f"📡 {args.url} ({info['model_name']}, {info['device']}, {info['backend']})")
+    print(f"{'callers':>7} | {'rows/s':>8} | {'req/s':>7} | {'p50 ms':>8} | {'p99 ms':>8} | {'rows/batch':>10} | {'errors':>6}")
+    for num_callers in [int(n) for n in args.callers.split(",")]:
+        stats_before = requests.get(f"{args.url}/health", timeout=10).json()["stats"]
+        latencies, errors = [], []
+        threads = [
+            threading.Thread(target=caller, args=(args.url, texts, args.rows, args.requests, args.max_len, seed, latencies, errors))
+            for seed in range(num_callers)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        stats = requests.get(f"{args.url}/health", timeout=10).json()["stats"]
+
+        # 서버가 여러 요청을 하나의 배치로 합친 정도
+        batches = max(stats["batches"] - stats_before["batches"], 1)
+        rows_per_batch = (stats["rows"] - stats_before["rows"]) / batches
+        latency_ms = np.array(latencies) * 1000 if latencies else np.array([np.nan])
+        print(f"{num_callers:>7} | {len(latencies) * args.rows / elapsed:>8.1f} | {len(latencies) / elapsed:>7.1f} | "
+              f"{np.percentile(latency_ms, 50):>8.1f} | {np.percentile(latency_ms, 99):>8.1f} | "
+              f"{rows_per_batch:>10.1f} | {len(errors):>6}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from transformers import AutoTokenizer
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(current_dir))
+
+from app.database.utils import EmbeddingPipeline, load_encoder, split_columns
+
+def main():
+    parser = argparse.ArgumentParser(description="shard(프로세스) 개수별 CPU 임베딩 처리량 측정")
+    parser.add_argument("--csv", default=os.path.join(os.path.dirname(current_dir), "docs/drift_data/kohate/train_split.csv"))
+    parser.add_argument("--model", default="klue/roberta-base")
+    parser.add_argument("--backend", default="torch")
+    parser.add_argument("--rows", type=int, default=4096)
+    parser.add_argument("--shards", default="1,2,4,8,16")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv).head(args.rows)
+    text_col, _ = split_columns(df)
+
+    # 단일 프로세스 기준값 (기본 intra-op 스레드 사용)
+    pipeline = EmbeddingPipeline(model_name=args.model, device="cpu", backend=args.backend)
+    pipeline.tokenizer = AutoTokenizer.from_pretrained(args.model, use_fast=pipeline.use_fast)
+    pipeline.model = load_encoder(args.model, "cpu", args.backend)
+    start = time.perf_counter()
+    reference = pipeline.generate_embeddings(df, text_col, num_workers=0)
+    baseline = len(df) / (time.perf_counter() - start)
+
+    print(f"📦 {args.csv} ({len(df)} rows, {os.cpu_count()} cores)")
+    print(f"{'shards':>6} | {'threads/shard':>13} | {'rows/s':>8} | {'speedup':>7} | {'max |diff|':>10}")
+    print(f"{'single':>6} | {'default':>13} | {baseline:>8.1f} | {1:>6.2f}x | {0:>10.2e}")
+    for num_shards in [int(n) for n in args.shards.split(",")]:
+        if num_shards > (os.cpu_count() or 1):
+            continue
+        threads = max(1, (os.cpu_count() or 1) // num_shards)
+        # 프로세스 생성 및 모델 로드 시간 포함
+        start = time.perf_counter()
+        embeddings = pipeline.generate_embeddings_sharded(df, text_col, num_shards, threads_per_shard=threads)
+        throughput = len(df) / (time.perf_counter() - start)
+        max_diff = float(np.abs(reference - embeddings).max())
+        print(f"{num_shards:>6} | {threads:>13} | {throughput:>8.1f} | {throughput / baseline:>6.2f}x | {max_diff:>10.2e}")
+    pipeline.shutdown_shards()
+
+if __name__ == "__main__":
+    main()
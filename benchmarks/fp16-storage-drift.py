@@ -0,0 +1,62 @@
+import os
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+from transformers import AutoTokenizer
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(current_dir))
+
+from app.database.utils import EmbeddingPipeline, load_encoder, split_columns
+from app.database.milvus_utils import VECTOR_STORAGE_TYPES, cast_to_storage
+from app.drift.pages.detect_datadrift import compute_drift_scores
+
+def embed_csv(pipeline: EmbeddingPipeline, path: str, rows: int) -> np.ndarray:
+    df = pd.read_csv(path).head(rows)
+    text_col, _ = split_columns(df)
+    return pipeline.generate_embeddings(df, text_col, num_workers=0)
+
+def main():
+    parser = argparse.ArgumentParser(description="float16 / bfloat16 저장 벡터의 드리프트 점수가 fp32와 같은지 확인")
+    data_dir = os.path.join(os.path.dirname(current_dir), "docs/drift_data/law")
+    parser.add_argument("--train-csv", default=os.path.join(data_dir, "train_data.csv"))
+    parser.add_argument("--test-csv", default=os.path.join(data_dir, "test_data.csv"))
+    parser.add_argument("--model", default="klue/roberta-base")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--storages", default="float16,bfloat16")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="fp32 대비 허용 drift score 절대 오차")
+    args = parser.parse_args()
+
+    # streamlit 세션 없이 실행하므로 load_model 대신 직접 로드
+    pipeline = EmbeddingPipeline(model_name=args.model)
+    pipeline.tokenizer = AutoTokenizer.from_pretrained(args.model, use_fast=pipeline.use_fast)
+    pipeline.model = load_encoder(args.model, pipeline.device, pipeline.backend)
+    train_embeddings = embed_csv(pipeline, args.train_csv, args.rows)
+    test_embeddings = embed_csv(pipeline, args.test_csv, args.rows)
+
+    reference = compute_drift_scores(train_embeddings, test_embeddings)
+
+    failed = False
+    print(f"{'storage':>9} | {'method':>24} | {'fp32 score':>10} | {'score':>10} | {'|diff|':>8} | drift")
+    for storage in [s for s in args.storages.split(",") if s in VECTOR_STORAGE_TYPES and s != "float32"]:
+        # Milvus에 저장되는 정밀도로 반올림 후 로드 시와 같이 float32로 복원
+        scores = compute_drift_scores(cast_to_storage(train_embeddings, storage),
+                                      cast_to_storage(test_embeddings, storage))
+        for name, reference_result in reference.items():
+            # 실패한 방법은 예외 객체가 값으로 반환됨 (detect_datadrift와 같이 건너뛰고 표시)
+            failed_result = next((r for r in (reference_result, scores[name]) if isinstance(r, Exception)), None)
+            if failed_result is not None:
+                print(f"{storage:>9} | {name:>24} | failed ({failed_result})")
+                continue
+            (reference_score, reference_detected), (score, detected) = reference_result, scores[name]
+            diff = abs(score - reference_score)
+            ok = diff <= args.tolerance and detected == reference_detected
+            failed |= not ok
+            print(f"{storage:>9} | {name:>24} | {reference_score:>10.4f} | {score:>10.4f} | {diff:>8.1e} | "
+                  f"{reference_detected} -> {detected} {'✅' if ok else '❌'}")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
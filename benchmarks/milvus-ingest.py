@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from pymilvus import utility
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(current_dir))
+
+from app.database.milvus_connection import ensure_milvus_connection
+from app.database.pages.vector_database import create_collection, insert_vectors, get_segment_count
+from app.database.bulk_insert import BulkFileWriter, bulk_insert_files
+from app.database.ingest_checkpoint import make_row_keys
+
+def main():
+    parser = argparse.ArgumentParser(description="insert_vectors per_batch(매 batch flush) vs bulk vs 파일 기반 bulk_insert 비교")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--modes", default="per_batch,bulk,bulk_insert")
+    parser.add_argument("--file-format", default="numpy")
+    args = parser.parse_args()
+    ensure_milvus_connection()
+
+    rng = np.random.default_rng(42)
+    vectors = rng.standard_normal((args.rows, args.dim)).astype(np.float32)
+    labels = [f"class_{i % 5}" for i in range(args.rows)]
+    keys = make_row_keys([str(i) for i in range(args.rows)], "train")
+
+    print(f"{'mode':>11} | {'rows':>8} | {'rows/s':>9} | {'segments':>8}")
+    for mode in args.modes.split(","):
+        collection_name = f"bench_ingest_{mode}"
+        if utility.has_collection(collection_name):
+            utility.drop_collection(collection_name)
+        create_collection(collection_name, dim=args.dim)
+
+        start = time.perf_counter()
+        if mode == "bulk_insert":
+            # columnar 파일 작성 + MinIO 업로드 + import task 완료까지 포함
+            writer = BulkFileWriter(collection_name, "train", args.dim, args.rows, file_format=args.file_format,
+                                    with_ids=True)
+            writer.append(vectors, labels, ids=keys)
+            inserted = bulk_insert_files(collection_name, "train", writer)
+        else:
+            ids = insert_vectors(collection_name, vectors, "train", labels, mode=mode, ids=keys)
+            inserted = sum(batch.insert_count for batch in ids)
+        elapsed = time.perf_counter() - start
+
+        print(f"{mode:>11} | {inserted:>8} | {inserted / elapsed:>9.0f} | {get_segment_count(collection_name)!s:>8}")
+        utility.drop_collection(collection_name)
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,17 @@
-from pymilvus import connections, utility, Collection
+import os
+import sys
+from typing import Optional
+from pymilvus import utility, Collection
 import warnings
 warnings.filterwarnings("ignore", category=UserWarning)
 
-def milvus_inpect(host: str = "localhost", port: str = "19530") -> None:
-    # Milvus 서버 연결
-    connections.connect("default", host=host, port=port)
+# 저장소 루트를 경로에 추가 (app 패키지 사용)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from app.database.milvus_connection import get_milvus_connection
+
+def milvus_inpect(host: Optional[str] = None, port: Optional[str] = None) -> None:
+    # Milvus 서버 연결 (지정하지 않으면 MILVUS_HOST / MILVUS_PORT / MILVUS_URI 설정 사용)
+    get_milvus_connection(host=host, port=port).connect()
 
     # 컬렉션 목록 가져오기
     collections = utility.list_collections()
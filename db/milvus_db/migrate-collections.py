@@ -0,0 +1,29 @@
+import os
+import sys
+from typing import Optional
+
+# 저장소 루트를 경로에 추가 (app 패키지 사용)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+def milvus_migrate(target: Optional[str] = None, host: Optional[str] = None, port: Optional[str] = None) -> None:
+    """기존 17컬럼 컬렉션을 벡터 컬렉션 + {name}__metadata 컬렉션으로 분리"""
+    from app.database.milvus_connection import get_milvus_connection
+    get_milvus_connection(host=host, port=port).connect()
+
+    from app.database.metadata_store import is_legacy_collection, list_data_collections, migrate_legacy_collection
+    from app.database.pages.vector_database import create_collection
+
+    targets = [target] if target else list_data_collections()
+    legacy = [name for name in targets if is_legacy_collection(name)]
+    if not legacy:
+        print("📭 마이그레이션할 컬렉션이 없습니다.")
+        return
+
+    for name in legacy:
+        migrate_legacy_collection(name, create_collection)
+        print(f"✅ Migrated collection: {name} (+ {name}__metadata)")
+
+# CLI 실행 지원
+if __name__ == "__main__":
+    target_collection = sys.argv[1] if len(sys.argv) > 1 else None
+    milvus_migrate(target=target_collection)
@@ -1,15 +1,24 @@
+import os
 import sys
 from typing import Optional
-from pymilvus import connections, utility
+from pymilvus import utility
 
-def milvus_rm(target: Optional[str] = None, host: str = "localhost", port: str = "19530") -> None:
-    # Milvus 서버 연결
-    connections.connect("default", host=host, port=port)
+# 저장소 루트를 경로에 추가 (app 패키지 사용)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from app.database.milvus_connection import get_milvus_connection
+
+def milvus_rm(target: Optional[str] = None, host: Optional[str] = None, port: Optional[str] = None) -> None:
+    # Milvus 서버 연결 (지정하지 않으면 MILVUS_HOST / MILVUS_PORT / MILVUS_URI 설정 사용)
+    get_milvus_connection(host=host, port=port).connect()
 
     if target:
         if utility.has_collection(target):
             utility.drop_collection(target)
             print(f"✅ Deleted collection: {target}")
+            # 분리 저장된 메타데이터 컬렉션도 함께 삭제
+            if utility.has_collection(f"{target}__metadata"):
+                utility.drop_collection(f"{target}__metadata")
+                print(f"✅ Deleted collection: {target}__metadata")
         else:
             print(f"❌ Collection '{target}' does not exist.")
     else:
@@ -73,6 +73,20 @@ def capture_function_output(func, *args, **kwargs):
         func(*args, **kwargs)
     return f.getvalue()
 
+# ------------------------------------- Model Registry -------------------------------------
+def render_model_registry():
+    """공유 모델 레지스트리의 모델별 참조 수 및 메모리 사용량 표시"""
+    # 임베딩 모듈이 아직 import되지 않았다면 torch를 불러오지 않고 종료
+    utils_module = sys.modules.get("app.database.utils")
+    report = utils_module.get_model_registry().report() if utils_module else []
+    if not report:
+        st.caption("로드된 임베딩 모델이 없습니다.")
+        return
+
+    st.dataframe(report, hide_index=True, use_container_width=True)
+    st.caption(f"Total: {sum(entry['memory_mb'] for entry in report):.1f} MB "
+               f"(max {utils_module.get_model_registry().max_models} models)")
+
 # ------------------------------------- Side Bar Navigation -------------------------------------
 def render_sidebar():
     with st.sidebar:
@@ -128,6 +142,11 @@ def render_sidebar():
                 with st.expander(f"🗑️ '{dataset_name}' 결과", expanded=True):
                     st.code(output, language="text")
 
+
+        st.markdown("---")
+        st.markdown("### Model Registry",
+                    help="프로세스 전체에서 공유 중인 임베딩 모델과 메모리 사용량을 확인합니다.")
+        render_model_registry()
         
         st.markdown("---")
         st.markdown("### Installed Models", 
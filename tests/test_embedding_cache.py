@@ -0,0 +1,68 @@
+import time
+
+import numpy as np
+import pytest
+
+from app.database.embedding_cache import EmbeddingCache
+
+DIM = 4
+NAMESPACE = EmbeddingCache.namespace("klue/roberta-base", 128)
+
+
+def vectors(*values):
+    return np.array([[value] * DIM for value in values], dtype=np.float32)
+
+
+def test_store_and_lookup_survive_reopen(tmp_path):
+    cache = EmbeddingCache(cache_dir=tmp_path, dim=DIM, max_bytes=16 * DIM * 4)
+    assert cache.store(["a", "b"], NAMESPACE, vectors(1, 2)) == 2
+
+    reopened = EmbeddingCache(cache_dir=tmp_path, dim=DIM, max_bytes=16 * DIM * 4)
+    found, hit_mask = reopened.lookup(["b", "c", "a"], NAMESPACE)
+    np.testing.assert_array_equal(hit_mask, [True, False, True])
+    np.testing.assert_array_equal(found, vectors(2, 0, 1))
+
+    # 새 항목은 기존 slot을 덮어쓰지 않음
+    reopened.store(["c"], NAMESPACE, vectors(3))
+    found, _ = reopened.lookup(["a", "b", "c"], NAMESPACE)
+    np.testing.assert_array_equal(found, vectors(1, 2, 3))
+
+
+def test_namespace_separates_entries(tmp_path):
+    cache = EmbeddingCache(cache_dir=tmp_path, dim=DIM, max_bytes=16 * DIM * 4)
+    cache.store(["a"], NAMESPACE, vectors(1))
+    _, hit_mask = cache.lookup(["a"], EmbeddingCache.namespace("klue/roberta-base", 256))
+    assert not hit_mask.any()
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = EmbeddingCache(cache_dir=tmp_path, dim=DIM, max_bytes=2 * DIM * 4)
+    cache.store(["a", "b"], NAMESPACE, vectors(1, 2))
+    time.sleep(0.01)
+    cache.lookup(["a"], NAMESPACE)
+    time.sleep(0.01)
+
+    cache.store(["c"], NAMESPACE, vectors(3))
+    found, hit_mask = cache.lookup(["a", "b", "c"], NAMESPACE)
+    np.testing.assert_array_equal(hit_mask, [True, False, True])
+    np.testing.assert_array_equal(found[[0, 2]], vectors(1, 3))
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["entries"] == 2
+
+
+def test_reopen_with_smaller_capacity_drops_out_of_range_slots(tmp_path):
+    cache = EmbeddingCache(cache_dir=tmp_path, dim=DIM, max_bytes=4 * DIM * 4)
+    cache.store(["a", "b", "c"], NAMESPACE, vectors(1, 2, 3))
+
+    smaller = EmbeddingCache(cache_dir=tmp_path, dim=DIM, max_bytes=1 * DIM * 4)
+    assert smaller.stats()["entries"] == 1
+    smaller.store(["d"], NAMESPACE, vectors(4))
+    found, hit_mask = smaller.lookup(["d"], NAMESPACE)
+    assert hit_mask.all()
+    np.testing.assert_array_equal(found, vectors(4))
+
+
+def test_dimension_mismatch_is_rejected(tmp_path):
+    cache = EmbeddingCache(cache_dir=tmp_path, dim=DIM, max_bytes=16 * DIM * 4)
+    with pytest.raises(ValueError):
+        cache.store(["a"], NAMESPACE, np.zeros((1, DIM + 1), dtype=np.float32))
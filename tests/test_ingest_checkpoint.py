@@ -0,0 +1,74 @@
+import numpy as np
+
+from app.database.ingest_checkpoint import IngestCheckpoint, content_digest, make_row_keys
+
+
+def test_row_keys_are_stable_int64():
+    texts = ["계약 해지", "손해 배상", "임대차"]
+    keys = make_row_keys(texts, "train")
+    assert keys.dtype == np.int64
+    assert (keys >= 0).all()
+    np.testing.assert_array_equal(keys, make_row_keys(texts, "train"))
+
+
+def test_row_keys_depend_on_split():
+    texts = ["계약 해지", "손해 배상"]
+    assert not set(make_row_keys(texts, "train")) & set(make_row_keys(texts, "test"))
+
+
+def test_duplicate_texts_get_distinct_occurrence_keys():
+    keys = make_row_keys(["a", "b", "a", "a"], "train")
+    assert len(set(keys)) == 4
+    # 같은 텍스트의 n번째 등장은 위치와 무관하게 같은 key
+    shifted = make_row_keys(["b", "a", "a", "a"], "train")
+    assert set(keys) == set(shifted)
+    assert keys[0] == shifted[1]
+
+
+def test_content_digest_changes_with_texts_and_labels():
+    base = content_digest(["a", "b"], ["x", "y"])
+    assert base == content_digest(["a", "b"], ["x", "y"])
+    assert base != content_digest(["a", "c"], ["x", "y"])
+    assert base != content_digest(["a", "b"], ["x", "z"])
+    # 구분자 덕분에 경계가 달라도 충돌하지 않음
+    assert content_digest(["ab", "c"]) != content_digest(["a", "bc"])
+
+
+def test_checkpoint_resume_and_complete(tmp_path):
+    fingerprint = IngestCheckpoint.fingerprint(model="klue/roberta-base", rows=100)
+    checkpoint = IngestCheckpoint("law", base_dir=tmp_path)
+    checkpoint.commit("train", fingerprint, 40, 100)
+
+    reloaded = IngestCheckpoint("law", base_dir=tmp_path)
+    assert reloaded.get_offset("train", fingerprint) == 40
+    assert not reloaded.is_complete("train", fingerprint)
+    assert reloaded.has_progress("train")
+
+    reloaded.commit("train", fingerprint, 100, 100)
+    assert reloaded.is_complete("train", fingerprint)
+
+
+def test_fingerprint_change_invalidates_progress(tmp_path):
+    old = IngestCheckpoint.fingerprint(rows=2, content=content_digest(["a", "b"]))
+    new = IngestCheckpoint.fingerprint(rows=2, content=content_digest(["a", "c"]))
+    assert old != new
+
+    checkpoint = IngestCheckpoint("law", base_dir=tmp_path)
+    checkpoint.commit("train", old, 2, 2)
+    assert checkpoint.get_offset("train", new) == 0
+    assert not checkpoint.is_complete("train", new)
+    assert checkpoint.is_stale("train", new)
+    assert not checkpoint.is_stale("train", old)
+    assert not checkpoint.is_stale("valid", new)
+    assert checkpoint.has_entry("train")
+    assert not checkpoint.has_entry("valid")
+
+
+def test_reset_split(tmp_path):
+    fingerprint = IngestCheckpoint.fingerprint(rows=10)
+    checkpoint = IngestCheckpoint("law", base_dir=tmp_path)
+    checkpoint.commit("train", fingerprint, 10, 10)
+    checkpoint.commit("test", fingerprint, 5, 10)
+    checkpoint.reset("train")
+    assert not checkpoint.has_progress("train")
+    assert IngestCheckpoint("law", base_dir=tmp_path).get_offset("test", fingerprint) == 5
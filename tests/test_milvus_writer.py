@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+
+from app.database.milvus_writer import MilvusWriter
+
+
+def wait_for(event):
+    assert event.wait(timeout=5)
+    return [event]
+
+
+def test_commit_offset_advances_only_over_contiguous_chunks():
+    writer = MilvusWriter(wait_for, max_workers=3, max_pending=3)
+    commits = []
+    writer.begin("train", offset=0, on_commit=commits.append)
+
+    events = [threading.Event() for _ in range(3)]
+    futures = [writer.submit("train", i * 10, (i + 1) * 10, events[i]) for i in range(3)]
+
+    # 뒤 chunk가 먼저 끝나도 앞 chunk가 반영되기 전까지 offset은 그대로
+    events[2].set()
+    futures[2].result(timeout=5)
+    events[1].set()
+    futures[1].result(timeout=5)
+    assert commits == [0, 0]
+
+    events[0].set()
+    writer.wait("train")
+    assert commits[-1] == 30
+    assert writer.stats()["splits"] == {"train": 30}
+    writer.close()
+
+
+def test_commit_resumes_from_begin_offset():
+    writer = MilvusWriter(lambda rows: rows, max_workers=1, max_pending=2)
+    commits = []
+    writer.begin("valid", offset=100, on_commit=commits.append)
+    writer.submit("valid", 100, 110, [1])
+    writer.submit("valid", 110, 115, [2])
+    assert writer.wait("valid") == [1, 2]
+    assert commits == [110, 115]
+    writer.close()
+
+
+def test_failed_chunk_blocks_commit_and_new_submits():
+    def write(fail):
+        if fail:
+            raise RuntimeError("insert failed")
+        return []
+
+    writer = MilvusWriter(write, max_workers=1, max_pending=2)
+    commits = []
+    writer.begin("test", on_commit=commits.append)
+    writer.submit("test", 0, 10, True)
+    with pytest.raises(RuntimeError):
+        writer.wait("test")
+    assert writer.has_error("test")
+    assert commits == []
+
+    # 실패 이후 chunk는 등록하지 않고 같은 예외를 전달
+    with pytest.raises(RuntimeError):
+        writer.submit("test", 10, 20, False)
+    writer.close()
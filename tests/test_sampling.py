@@ -0,0 +1,61 @@
+import re
+
+import numpy as np
+
+from app.drift.sampling import SAMPLE_OVERFETCH, key_rank, make_sample_plan, select_sample
+
+
+def test_same_seed_gives_same_plan():
+    class_counts = {"법률": 4_000_000, "기타": 1_000_000}
+    assert make_sample_plan("train", class_counts, 20_000, seed=42) == make_sample_plan("train", class_counts, 20_000, seed=42)
+    assert make_sample_plan("train", class_counts, 20_000, seed=42) != make_sample_plan("train", class_counts, 20_000, seed=7)
+
+
+def test_plan_preserves_class_proportions():
+    class_counts = {"a": 600_000, "b": 300_000, "c": 100_000}
+    plan = make_sample_plan("train", class_counts, 10_000)
+    takes = [take for _, take in plan]
+    assert takes == [6_000, 3_000, 1_000]
+
+    for (expr, take), count in zip(plan, class_counts.values()):
+        modulus = int(re.search(r"id % (\d+) ==", expr).group(1))
+        # 한 bucket의 기대 행 수는 표본 수 이상, modulus 반올림을 감안한 overfetch 비율 이하
+        assert take <= count / modulus <= take * SAMPLE_OVERFETCH * (modulus + 1) / modulus
+
+
+def test_small_class_keeps_at_least_one_row():
+    plan = make_sample_plan("test", {"major": 1_000_000, "rare": 3}, 1_000)
+    assert plan[1][1] == 1
+
+
+def test_no_plan_when_sample_covers_split():
+    assert make_sample_plan("valid", {"a": 50, "b": 50}, 100) is None
+
+
+def test_uniform_plan_without_class_counts():
+    plan = make_sample_plan("train", {None: 1_000_000}, 10_000)
+    assert len(plan) == 1
+    assert "class" not in plan[0][0]
+    assert plan[0][1] == 10_000
+
+
+def test_class_labels_are_quoted():
+    plan = make_sample_plan("train", {'say "hi"': 1_000, "b": 1_000}, 100)
+    assert plan[0][0].startswith('class == "say \\"hi\\""')
+
+
+def test_key_rank_is_reproducible():
+    ids = np.arange(1_000, dtype=np.int64)
+    np.testing.assert_array_equal(key_rank(ids, 42), key_rank(ids, 42))
+    assert not np.array_equal(key_rank(ids, 42), key_rank(ids, 7))
+
+
+def test_select_sample_is_ordered_and_stable():
+    ids = np.arange(10_000, dtype=np.int64) * 7919
+    keep = select_sample(ids, 500, seed=42)
+    assert len(keep) == 500
+    assert (np.diff(keep) > 0).all()
+    np.testing.assert_array_equal(keep, select_sample(ids, 500, seed=42))
+    # 행 순서가 바뀌어도 같은 key가 선택됨
+    shuffled = np.random.default_rng(0).permutation(ids)
+    assert set(ids[keep]) == set(shuffled[select_sample(shuffled, 500, seed=42)])
@@ -0,0 +1,75 @@
+import os
+
+import numpy as np
+
+from app.database.snapshot_cache import EmbeddingSnapshotCache, snapshot_version
+
+
+def make_arrays(rows, dim=8, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "ids": np.arange(rows, dtype=np.int64),
+        "vectors": rng.standard_normal((rows, dim)).astype(np.float32),
+        "labels": rng.integers(0, 2, rows).astype(np.int32),
+        "classes": ["a", "b"],
+    }
+
+
+def set_last_used(cache, collection_name, version, split, timestamp):
+    os.utime(cache._path(collection_name, version, split), (timestamp, timestamp))
+
+
+def test_put_then_get_returns_memmap(tmp_path):
+    cache = EmbeddingSnapshotCache(cache_dir=tmp_path, max_bytes=1024 ** 2)
+    arrays = make_arrays(10)
+    cached = cache.put("law", "v1", "train", arrays)
+    assert isinstance(cached["vectors"], np.memmap)
+    np.testing.assert_array_equal(cached["vectors"], arrays["vectors"])
+    assert cached["population"] == 10 and cached["classes"] == ["a", "b"]
+    assert cache.get("law", "v1", "valid") is None
+
+
+def test_new_version_drops_previous_snapshots(tmp_path):
+    cache = EmbeddingSnapshotCache(cache_dir=tmp_path, max_bytes=1024 ** 2)
+    cache.put("law", "v1", "train", make_arrays(10))
+    cache.put("law", "v2", "train", make_arrays(10, seed=1))
+    assert cache.get("law", "v1", "train") is None
+    assert cache.get("law", "v2", "train") is not None
+
+
+def test_least_recently_used_snapshot_is_evicted(tmp_path):
+    arrays = make_arrays(100)
+    nbytes = sum(arrays[name].nbytes for name in ["ids", "vectors", "labels"])
+
+    probe = EmbeddingSnapshotCache(cache_dir=tmp_path / "probe", max_bytes=1024 ** 2)
+    probe.put("law", "v1", "train", arrays)
+    disk_bytes = probe._size(probe._path("law", "v1", "train"))
+
+    # 스냅샷 두 개까지만 저장 가능한 용량
+    cache = EmbeddingSnapshotCache(cache_dir=tmp_path / "cache", max_bytes=2 * disk_bytes + nbytes - 1)
+    cache.put("law", "v1", "train", arrays)
+    cache.put("news", "v1", "train", arrays)
+    set_last_used(cache, "law", "v1", "train", 2_000_000_000)
+    set_last_used(cache, "news", "v1", "train", 1_000_000_000)
+
+    cache.put("law", "v1", "test", arrays)
+    assert cache.get("news", "v1", "train") is None
+    assert cache.get("law", "v1", "train") is not None
+    assert cache.get("law", "v1", "test") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_snapshot_larger_than_capacity_is_not_stored(tmp_path):
+    cache = EmbeddingSnapshotCache(cache_dir=tmp_path, max_bytes=100)
+    arrays = make_arrays(100)
+    assert cache.put("law", "v1", "train", arrays) is arrays
+    assert cache.stats()["entries"] == 0
+
+
+def test_snapshot_version_tracks_manifest_contents():
+    manifest = {"updated_at": 1, "splits": {"train": {"rows": 10, "checksum": "abc"}}}
+    changed = {"updated_at": 1, "splits": {"train": {"rows": 10, "checksum": "abd"}}}
+    assert snapshot_version(manifest) == snapshot_version(dict(manifest))
+    assert snapshot_version(manifest) != snapshot_version(changed)
+    assert snapshot_version(timestamp=123) == "123"
+    assert snapshot_version() is None
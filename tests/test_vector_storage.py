@@ -0,0 +1,33 @@
+import numpy as np
+
+from app.database.milvus_utils import cast_to_storage, decode_vector, encode_vectors
+
+
+def test_float32_is_passed_through():
+    vectors = np.random.default_rng(0).standard_normal((3, 8)).astype(np.float32)
+    np.testing.assert_array_equal(encode_vectors(vectors), vectors)
+    np.testing.assert_array_equal(decode_vector(vectors[0].tolist()), vectors[0])
+
+
+def test_float16_round_trip():
+    vectors = np.random.default_rng(0).standard_normal((3, 8)).astype(np.float32)
+    encoded = encode_vectors(vectors, "float16")
+    assert [len(row) for row in encoded] == [8 * 2] * 3
+    # query 결과는 [bytes] 형태로 반환됨
+    decoded = np.stack([decode_vector([row], "float16") for row in encoded])
+    np.testing.assert_array_equal(decoded, vectors.astype(np.float16).astype(np.float32))
+
+
+def test_bfloat16_round_trip_within_precision():
+    vectors = np.random.default_rng(0).standard_normal((3, 8)).astype(np.float32)
+    encoded = encode_vectors(vectors, "bfloat16")
+    assert [len(row) for row in encoded] == [8 * 2] * 3
+    decoded = np.stack([decode_vector(row, "bfloat16") for row in encoded])
+    # 가수 7비트: 상대 오차는 반올림 단위(2^-8) 이하
+    assert (np.abs(decoded - vectors) <= np.abs(vectors) * 2.0 ** -8).all()
+
+
+def test_bfloat16_rounds_half_to_even():
+    # 1 + 2^-8은 1과 1 + 2^-7의 중간 -> 짝수인 1, 1 + 3 * 2^-8은 1 + 2^-6으로 반올림
+    values = np.array([[1.0, 1 + 2.0 ** -8, 1 + 3 * 2.0 ** -8, -2.5]], dtype=np.float32)
+    np.testing.assert_array_equal(cast_to_storage(values, "bfloat16"), [[1.0, 1.0, 1 + 2.0 ** -6, -2.5]])